@@ -0,0 +1,79 @@
+"""
+Per-commit overhead of application code running in the transactional context.
+
+Run it with SQLAlchemy 1.4 and 2.0 to compare the savepoint restart listener
+with the native join_transaction_mode="create_savepoint".
+
+    python -m benchmarks.bench_commit_overhead
+"""
+import time
+from typing import Callable
+
+import sqlalchemy
+from sqlalchemy.orm import Session
+from sqlalchemy_utils import create_database, database_exists
+
+from benchmarks.utils import print_table
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+from pytest_sqlalchemy_session.fixtures import modify_transaction_to_rollback
+from pytest_sqlalchemy_session_test.app import db, functions
+from pytest_sqlalchemy_session_test.app.tables import metadata, sample_table
+
+ITERATIONS = 1000
+# create_instance_with_rollback commits twice and rolls back once
+TRANSACTIONS = ITERATIONS * 3
+
+
+def commit_in_loop(session: Session) -> None:
+    for number in range(ITERATIONS):
+        functions.create_instance_with_rollback_injection(
+            session, number * 3, number * 3 + 1, number * 3 + 2
+        )
+
+
+def measure(run: Callable[[], None]) -> float:
+    started_at = time.perf_counter()
+    run()
+    duration = time.perf_counter() - started_at
+    cleanup()
+
+    return duration / TRANSACTIONS * 1e6
+
+
+def plain_session() -> None:
+    # Real commits, as outside of tests
+    with db.session_factory() as session:
+        commit_in_loop(session)
+
+
+def cleanup() -> None:
+    with db.engine.begin() as connection:
+        connection.execute(sample_table.delete())
+
+
+def transactional_context() -> None:
+    with modify_transaction_to_rollback((db.session_factory, db.engine)) as db_:
+        _, _, session = db_
+        commit_in_loop(session)
+
+
+def main() -> None:
+    if not database_exists(db.get_db_dsn()):
+        create_database(db.get_db_dsn())
+
+    metadata.create_all(db.engine)
+    cleanup()
+    backend = "native" if NATIVE_JOIN_TRANSACTION else "savepoint restart"
+
+    print_table(
+        f"{TRANSACTIONS} transactions of app code, SQLAlchemy {sqlalchemy.__version__}",
+        {
+            "plain session": measure(plain_session),
+            f"transactional context ({backend})": measure(transactional_context),
+        },
+        unit="us/transaction",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Per-test overhead of the database time report.
+
+    python -m benchmarks.bench_db_time_report
+"""
+from benchmarks.utils import best_run, per_test_overhead, print_table, total_per_test
+
+TESTS = 1000
+
+SOURCE = f"""
+import pytest
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+@pytest.mark.parametrize("number", range({TESTS}))
+def test_with_db(db_session, number):
+    db_session.execute(sample_table.insert(), {{"id": number}})
+    db_session.execute(sample_table.select()).fetchall()
+"""
+
+
+def main() -> None:
+    default = best_run(SOURCE)
+    report = best_run(SOURCE, "--db-time-report")
+
+    print_table(
+        f"Setup + teardown of {TESTS} tests using db_session",
+        {
+            "default": per_test_overhead(default),
+            "db-time-report": per_test_overhead(report),
+        },
+    )
+    print_table(
+        f"Setup + call + teardown of {TESTS} tests using db_session",
+        {
+            "default": total_per_test(default),
+            "db-time-report": total_per_test(report),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
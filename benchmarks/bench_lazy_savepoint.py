@@ -0,0 +1,139 @@
+"""
+Round trips per test to the database, counted at the DBAPI connection so the
+savepoints the plugin emits on the cursor itself are counted too, as well as
+the BEGIN psycopg2 sends before the first statement of a transaction. A test
+that only reads, or doesn't touch the database at all, shouldn't pay for
+savepoints it never needs.
+
+    python -m benchmarks.bench_lazy_savepoint
+"""
+from typing import Any, Callable, List, Optional
+
+import psycopg2.extensions
+import sqlalchemy
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy_utils import create_database, database_exists
+
+from benchmarks.utils import print_table
+from pytest_sqlalchemy_session.fixtures import (
+    SharedConnection,
+    modify_transaction_to_rollback,
+)
+from pytest_sqlalchemy_session_test.app import db
+from pytest_sqlalchemy_session_test.app.tables import metadata, sample_table
+
+TESTS = 100
+
+statements: List[str] = []
+
+
+class CountingCursor(psycopg2.extensions.cursor):
+    def execute(self, query: Any, vars: Any = None) -> None:
+        if self.connection.status == psycopg2.extensions.STATUS_READY:
+            statements.append("BEGIN")
+
+        statements.append(query)
+        super().execute(query, vars)
+
+
+class CountingConnection(psycopg2.extensions.connection):
+    def cursor(self, *args: Any, **kwargs: Any) -> Any:
+        kwargs.setdefault("cursor_factory", CountingCursor)
+        return super().cursor(*args, **kwargs)
+
+    def commit(self) -> None:
+        if self.status == psycopg2.extensions.STATUS_BEGIN:
+            statements.append("COMMIT")
+
+        super().commit()
+
+    def rollback(self) -> None:
+        # Outside of a transaction psycopg2 doesn't send anything
+        if self.status == psycopg2.extensions.STATUS_BEGIN:
+            statements.append("ROLLBACK")
+
+        super().rollback()
+
+
+def untouched(session: Session) -> None:
+    pass
+
+
+def read_only(session: Session) -> None:
+    session.execute(select(sample_table)).fetchall()
+
+
+def read_and_commit(session: Session) -> None:
+    session.execute(select(sample_table)).fetchall()
+    session.commit()
+    session.execute(select(sample_table)).fetchall()
+
+
+def write(session: Session) -> None:
+    session.execute(sample_table.insert(), {"id": 1})
+    session.commit()
+
+
+def round_trips(
+    scenario: Callable[[Session], None], reuse_connection: bool = False
+) -> float:
+    engine = create_engine(
+        db.get_db_dsn(), connect_args={"connection_factory": CountingConnection}
+    )
+    session_factory = sessionmaker(bind=engine)
+    shared: Optional[SharedConnection] = None
+
+    if reuse_connection:
+        shared = SharedConnection(engine)
+
+    # Warm up the pool and the shared connection
+    with modify_transaction_to_rollback((session_factory, engine), shared):
+        pass
+
+    statements.clear()
+
+    for _ in range(TESTS):
+        with modify_transaction_to_rollback((session_factory, engine), shared) as db_:
+            _, _, session = db_
+            scenario(session)
+
+    count = len(statements) / TESTS
+
+    if shared is not None:
+        shared.close()
+
+    engine.dispose()
+
+    return count
+
+
+def main() -> None:
+    if not database_exists(db.get_db_dsn()):
+        create_database(db.get_db_dsn())
+
+    metadata.create_all(db.engine)
+
+    scenarios = {
+        "untouched": untouched,
+        "read-only": read_only,
+        "read, commit, read": read_and_commit,
+        "write": write,
+    }
+    rows = {name: round_trips(scenario) for name, scenario in scenarios.items()}
+    rows.update(
+        {
+            f"{name}, reuse-db-connection": round_trips(scenario, True)
+            for name, scenario in scenarios.items()
+        }
+    )
+
+    print_table(
+        f"Round trips per test, SQLAlchemy {sqlalchemy.__version__}",
+        rows,
+        unit="round trips/test",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Per-test fixture overhead of the plugin for tests that do not use the database.
+
+    python -m benchmarks.bench_lazy_session
+"""
+from benchmarks.utils import per_test_overhead, print_table, run_suite
+
+TESTS = 1000
+
+SOURCE = f"""
+import pytest
+
+@pytest.mark.parametrize("number", range({TESTS}))
+def test_without_db(number):
+    assert number >= 0
+"""
+
+CONTROL_CONFTEST = """
+import pytest
+
+@pytest.fixture(scope="session")
+def _db():
+    return None
+"""
+
+
+def main() -> None:
+    control = per_test_overhead(run_suite(SOURCE, conftest=CONTROL_CONFTEST))
+    plugin = per_test_overhead(run_suite(SOURCE))
+
+    print_table(
+        f"Setup + teardown of {TESTS} tests without the database",
+        {
+            "without plugin": control,
+            "with plugin": plugin,
+            "plugin overhead": plugin - control,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
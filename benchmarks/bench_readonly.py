@@ -0,0 +1,40 @@
+"""
+Per-test time of tests that only read, in a root transaction and savepoints
+of their own or in the read-only transaction they share.
+
+    python -m benchmarks.bench_readonly
+"""
+from benchmarks.utils import best_run, print_table, total_per_test
+
+TESTS = 1000
+
+SOURCE = """
+import pytest
+from pytest_sqlalchemy_session_test.app import db
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+@pytest.mark.parametrize("number", range({tests}))
+@pytest.mark.sqlalchemy_db{marker_args}
+def test_read(number):
+    with db.session_factory() as session:
+        session.execute(sample_table.select()).fetchall()
+"""
+
+
+def main() -> None:
+    savepoints = total_per_test(best_run(SOURCE.format(tests=TESTS, marker_args="")))
+    readonly = total_per_test(
+        best_run(SOURCE.format(tests=TESTS, marker_args="(readonly=True)"))
+    )
+
+    print_table(
+        f"Setup, call and teardown of {TESTS} read-only tests",
+        {
+            "sqlalchemy_db": savepoints,
+            "sqlalchemy_db(readonly=True)": readonly,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
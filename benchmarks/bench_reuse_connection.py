@@ -0,0 +1,33 @@
+"""
+Per-test fixture overhead of database tests with and without connection reuse.
+
+    python -m benchmarks.bench_reuse_connection
+"""
+from benchmarks.utils import per_test_overhead, print_table, run_suite
+
+TESTS = 1000
+
+SOURCE = f"""
+import pytest
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+@pytest.mark.parametrize("number", range({TESTS}))
+def test_with_db(db_session, number):
+    db_session.execute(sample_table.insert(), {{"id": number}})
+"""
+
+
+def main() -> None:
+    print_table(
+        f"Setup + teardown of {TESTS} tests using db_session",
+        {
+            "default": per_test_overhead(run_suite(SOURCE)),
+            "reuse-db-connection": per_test_overhead(
+                run_suite(SOURCE, ini="reuse-db-connection=True")
+            ),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
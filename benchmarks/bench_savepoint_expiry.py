@@ -0,0 +1,79 @@
+"""
+Per-commit cost of the expiry strategies of the savepoint restart, for a batch
+importer committing in a loop with a large identity map. The strategies apply
+to the sessions of SQLAlchemy 1.4.
+
+    python -m benchmarks.bench_savepoint_expiry
+"""
+import time
+
+import sqlalchemy
+from sqlalchemy.orm import Session, registry
+from sqlalchemy_utils import create_database, database_exists
+
+from benchmarks.utils import print_table
+from pytest_sqlalchemy_session.fixtures import (
+    EXPIRY_STRATEGIES,
+    modify_transaction_to_rollback,
+)
+from pytest_sqlalchemy_session_test.app import db
+from pytest_sqlalchemy_session_test.app.tables import metadata, sample_table
+
+LOADED_OBJECTS = 10000
+COMMITS = 1000
+
+
+class Sample:
+    def __init__(self, id: int):
+        self.id = id
+
+
+registry().map_imperatively(Sample, sample_table)
+
+
+def import_in_batches(session: Session) -> float:
+    session.execute(
+        sample_table.insert(), [{"id": number} for number in range(LOADED_OBJECTS)]
+    )
+    loaded = session.query(Sample).all()
+    started_at = time.perf_counter()
+
+    for number in range(COMMITS):
+        session.add(Sample(LOADED_OBJECTS + number))
+        session.commit()
+
+    duration = time.perf_counter() - started_at
+    assert len(loaded) == LOADED_OBJECTS  # nosec
+
+    return duration / COMMITS * 1e6
+
+
+def measure(expiry: str, expire_on_commit: bool = True) -> float:
+    with modify_transaction_to_rollback(
+        (db.session_factory, db.engine), expiry=expiry
+    ) as db_:
+        _, _, session = db_
+        session.expire_on_commit = expire_on_commit
+
+        return import_in_batches(session)
+
+
+def main() -> None:
+    if not database_exists(db.get_db_dsn()):
+        create_database(db.get_db_dsn())
+
+    metadata.create_all(db.engine)
+
+    rows = {f"expiry {expiry}": measure(expiry) for expiry in EXPIRY_STRATEGIES}
+    rows["expiry none, expire_on_commit=False"] = measure("none", False)
+
+    print_table(
+        f"{COMMITS} commits with {LOADED_OBJECTS} objects loaded, "
+        f"SQLAlchemy {sqlalchemy.__version__}",
+        rows,
+        unit="us/commit",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-test overhead of routing the application sessions of marked tests: the
+session factories routed once per session against patching sessionmaker.__call__
+with pytest-mock in every test.
+
+    python -m benchmarks.bench_session_routing
+"""
+from benchmarks.utils import CONFTEST_PATH, best_run, per_test_overhead, print_table
+
+TESTS = 1000
+
+SOURCE = f"""
+import pytest
+from pytest_sqlalchemy_session_test.app import db
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+@pytest.mark.parametrize("number", range({TESTS}))
+@pytest.mark.sqlalchemy_db
+def test_with_db(number):
+    with db.session_factory() as session:
+        session.execute(sample_table.select()).fetchall()
+"""
+
+PATCHING_FIXTURE = """
+
+from sqlalchemy.orm import sessionmaker
+from pytest_sqlalchemy_session.markers import get_db_markers
+
+
+@pytest.fixture(scope="function", autouse=True)
+def _auto_mock_session_by_marker(request):
+    if not get_db_markers(request.node).sqlalchemy_db:
+        return
+
+    def _lazy_session(*args, **kwargs):
+        return request.getfixturevalue("_session")
+
+    mocker = request.getfixturevalue("mocker")
+    mocker.patch.object(sessionmaker, "__call__", side_effect=_lazy_session)
+"""
+
+
+def main() -> None:
+    with open(CONFTEST_PATH) as conf:
+        patching_conftest = conf.read() + PATCHING_FIXTURE
+
+    patching = per_test_overhead(best_run(SOURCE, conftest=patching_conftest))
+    routing = per_test_overhead(best_run(SOURCE))
+
+    print_table(
+        f"Setup + teardown of {TESTS} marked tests",
+        {
+            "sessionmaker.__call__ patched per test": patching,
+            "session factories routed per session": routing,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Wall time of a run on pytest-xdist workers with an expensive seeding: each
+worker seeding a database of its own, or the workers sharing one database
+seeded once and beginning their tests from a snapshot of it.
+
+    python -m benchmarks.bench_shared_snapshot
+"""
+import time
+
+from benchmarks.utils import print_table, run_suite
+
+WORKERS = 4
+TESTS = 200
+SEED_ROWS = 2000000
+
+CONFTEST = f"""
+import pytest
+from sqlalchemy import text
+from pytest_sqlalchemy_session_test.app import db
+from pytest_sqlalchemy_session_test.app.tables import metadata
+
+pytest_plugins = ["pytest_sqlalchemy_session.plugin"]
+
+
+@pytest.fixture(scope="session")
+def _db_url():
+    return db.get_db_dsn().set(database="pytest_sqlalchemy_session_bench")
+
+
+@pytest.fixture(scope="session")
+def _db_setup():
+    def setup(connection):
+        metadata.create_all(connection)
+        connection.execute(
+            text("INSERT INTO sample_table SELECT generate_series(1, {SEED_ROWS})")
+        )
+
+    return setup
+"""
+
+SOURCE = f"""
+import pytest
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+@pytest.mark.parametrize("number", range({TESTS}))
+def test_with_db(db_session, number):
+    db_session.execute(sample_table.delete().where(sample_table.c.id == number + 1))
+"""
+
+
+def wall_time(*args: str) -> float:
+    started_at = time.perf_counter()
+    run_suite(
+        SOURCE, conftest=CONFTEST, args=("-p", "xdist", "-n", str(WORKERS), *args)
+    )
+
+    return time.perf_counter() - started_at
+
+
+def main() -> None:
+    print_table(
+        f"{TESTS} tests on {WORKERS} workers, {SEED_ROWS} seeded rows",
+        {
+            "database per worker": wall_time(),
+            "shared database and snapshot": wall_time("-o", "shared-db-snapshot=True"),
+        },
+        unit="s",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Per-test overhead of the SQL log kept for the failures.
+
+    python -m benchmarks.bench_sql_log
+"""
+from benchmarks.utils import best_run, per_test_overhead, print_table, total_per_test
+
+TESTS = 1000
+
+SOURCE = f"""
+import pytest
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+@pytest.mark.parametrize("number", range({TESTS}))
+def test_with_db(db_session, number):
+    db_session.execute(sample_table.insert(), {{"id": number}})
+    db_session.execute(sample_table.select()).fetchall()
+"""
+
+
+def main() -> None:
+    default = best_run(SOURCE)
+    sql_log = best_run(SOURCE, "--db-sql-log=50")
+
+    print_table(
+        f"Setup + teardown of {TESTS} tests using db_session",
+        {
+            "default": per_test_overhead(default),
+            "db-sql-log=50": per_test_overhead(sql_log),
+        },
+    )
+    print_table(
+        f"Setup + call + teardown of {TESTS} tests using db_session",
+        {
+            "default": total_per_test(default),
+            "db-sql-log=50": total_per_test(sql_log),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
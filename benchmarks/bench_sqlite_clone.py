@@ -0,0 +1,65 @@
+"""
+Per-test overhead of isolating the tests on an in-memory SQLite database:
+a transaction rolled back to its savepoints against a copy of the seeded
+database made with the backup API for each test.
+
+    python -m benchmarks.bench_sqlite_clone
+"""
+from benchmarks.utils import best_run, per_test_overhead, print_table
+
+TESTS = 1000
+SEED_ROWS = 1000
+
+CONFTEST = f"""
+import pytest
+from pytest_sqlalchemy_session_test.app.tables import metadata, sample_table
+
+pytest_plugins = ["pytest_sqlalchemy_session.plugin"]
+
+
+@pytest.fixture(scope="session")
+def _db_url():
+    return "sqlite://"
+
+
+@pytest.fixture(scope="session")
+def _db_setup():
+    def setup(connection):
+        metadata.create_all(connection)
+        connection.execute(sample_table.insert(), [{{"id": number}} for number in range({SEED_ROWS})])
+
+    return setup
+"""
+
+SOURCE = f"""
+import pytest
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+@pytest.mark.parametrize("number", range({TESTS}))
+@pytest.mark.sqlalchemy_db
+def test_with_db(_db, number):
+    session_factory, _ = _db
+
+    with session_factory() as session:
+        session.execute(sample_table.insert(), {{"id": {SEED_ROWS} + number}})
+        session.commit()
+"""
+
+
+def main() -> None:
+    savepoints = per_test_overhead(best_run(SOURCE, conftest=CONFTEST))
+    clones = per_test_overhead(
+        best_run(SOURCE, "-o", "sqlite-db-clone=True", conftest=CONFTEST)
+    )
+
+    print_table(
+        f"Setup + teardown of {TESTS} marked tests, {SEED_ROWS} seeded rows",
+        {
+            "transaction and savepoints": savepoints,
+            "copy of the database": clones,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
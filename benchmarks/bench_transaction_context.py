@@ -0,0 +1,52 @@
+"""
+Setup and teardown cost of the transactional context of a single test.
+
+    python -m benchmarks.bench_transaction_context
+"""
+import time
+from typing import Optional
+
+from sqlalchemy_utils import create_database, database_exists
+
+from benchmarks.utils import print_table
+from pytest_sqlalchemy_session.fixtures import (
+    SharedConnection,
+    modify_transaction_to_rollback,
+)
+from pytest_sqlalchemy_session_test.app import db
+
+ITERATIONS = 2000
+
+
+def measure(shared_connection: Optional[SharedConnection] = None) -> float:
+    started_at = time.perf_counter()
+
+    for _ in range(ITERATIONS):
+        with modify_transaction_to_rollback(
+            (db.session_factory, db.engine), shared_connection
+        ) as (_, _, session):
+            session.connection()
+
+    return (time.perf_counter() - started_at) / ITERATIONS * 1e6
+
+
+def main() -> None:
+    if not database_exists(db.get_db_dsn()):
+        create_database(db.get_db_dsn())
+
+    shared_connection = SharedConnection(db.engine)
+
+    try:
+        print_table(
+            f"Transactional context of {ITERATIONS} tests",
+            {
+                "default": measure(),
+                "shared connection": measure(shared_connection),
+            },
+        )
+    finally:
+        shared_connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Pytest plugin loaded into the benchmarked runs.
+
+Accumulates the duration of every test phase and dumps the totals into the file
+named by the ``BENCHMARK_OUTPUT`` environment variable.
+"""
+import json
+import os
+from collections import defaultdict
+from typing import DefaultDict
+
+import pytest
+from _pytest.reports import TestReport
+
+_durations: DefaultDict[str, float] = defaultdict(float)
+
+
+@pytest.hookimpl
+def pytest_runtest_logreport(report: TestReport) -> None:
+    if report.when is None:
+        return
+
+    _durations[report.when] += report.duration
+
+    if report.when == "call":
+        _durations["tests"] += 1
+
+
+@pytest.hookimpl
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    with open(os.environ["BENCHMARK_OUTPUT"], "w") as output:
+        json.dump(_durations, output)
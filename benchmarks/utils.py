@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess  # nosec
+import sys
+import tempfile
+import textwrap
+from typing import Dict, Optional, Sequence
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFTEST_PATH = os.path.join(ROOT_DIR, "tests", "_conftest.py")
+
+
+def run_suite(
+    source: str,
+    conftest: Optional[str] = None,
+    ini: str = "",
+    args: Sequence[str] = (),
+) -> Dict[str, float]:
+    """
+    Run the test module ``source`` in a temporary directory and return the total
+    durations of the setup, call and teardown phases.
+    """
+    if conftest is None:
+        with open(CONFTEST_PATH) as conf:
+            conftest = conf.read()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _write(tmp_dir, "conftest.py", conftest)
+        _write(tmp_dir, "test_benchmark.py", source)
+        _write(tmp_dir, "pytest.ini", "[pytest]\n" + textwrap.dedent(ini))
+
+        output = os.path.join(tmp_dir, "durations.json")
+        env = dict(os.environ, PYTHONPATH=ROOT_DIR, BENCHMARK_OUTPUT=output)
+        subprocess.run(  # nosec
+            [sys.executable, "-m", "pytest", "-q", "-p", "benchmarks.plugin", *args],
+            cwd=tmp_dir,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+        with open(output) as durations:
+            return json.load(durations)
+
+
+def per_test_overhead(durations: Dict[str, float]) -> float:
+    """Fixture setup and teardown time per test, in microseconds."""
+    return (durations["setup"] + durations["teardown"]) / durations["tests"] * 1e6
+
+
+def total_per_test(durations: Dict[str, float]) -> float:
+    """Setup, call and teardown time per test, in microseconds."""
+    return (
+        (durations["setup"] + durations["call"] + durations["teardown"])
+        / durations["tests"]
+        * 1e6
+    )
+
+
+def best_run(
+    source: str, *args: str, conftest: Optional[str] = None, rounds: int = 3
+) -> Dict[str, float]:
+    """The runs are noisy, the fastest of a few rounds is kept."""
+    runs = [run_suite(source, conftest=conftest, args=args) for _ in range(rounds)]
+
+    return min(runs, key=total_per_test)
+
+
+def print_table(title: str, rows: Dict[str, float], unit: str = "us/test") -> None:
+    print(title)
+
+    for name, value in rows.items():
+        print(f"  {name:<40} {value:>12.1f} {unit}")
+
+
+def _write(directory: str, name: str, content: str) -> None:
+    with open(os.path.join(directory, name), "w") as file:
+        file.write(textwrap.dedent(content))
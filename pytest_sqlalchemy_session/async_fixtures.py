@@ -0,0 +1,193 @@
+import contextlib
+import inspect
+import typing
+from typing import AsyncGenerator, Optional, Tuple
+
+import pytest
+import pytest_asyncio
+from pytest import Config, FixtureRequest
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    AsyncTransaction,
+)
+from sqlalchemy.orm import sessionmaker
+
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+from pytest_sqlalchemy_session.fixtures import RestartSavepoint
+from pytest_sqlalchemy_session.markers import get_db_markers
+from pytest_sqlalchemy_session.routing import (
+    Route,
+    SessionRouter,
+    session_route,
+    set_route,
+)
+from pytest_sqlalchemy_session.session import TestSession
+
+# A sessionmaker(class_=AsyncSession) or an async_sessionmaker
+AsyncDbType = Tuple[typing.Any, AsyncEngine]
+
+
+async def _begin_legacy_async_session(
+    session_factory: typing.Any,
+    connection: AsyncConnection,
+    root_transaction: AsyncTransaction,
+    expiry: str,
+) -> AsyncSession:
+    session = AsyncSession(
+        **{
+            **session_factory.kw,
+            "bind": connection,
+            "sync_session_class": TestSession,
+        }
+    )
+    sync_session = typing.cast(TestSession, session.sync_session)
+
+    # Begin a nested transaction, the sync session restarts it the same way
+    # as in the sync context
+    main_nested_transaction = await session.begin_nested()
+    sync_session.restart_savepoint = RestartSavepoint(
+        root_transaction=root_transaction.sync_transaction,
+        main_nested_transaction=main_nested_transaction.sync_transaction,
+        expiry=expiry,
+    )
+
+    return session
+
+
+@contextlib.asynccontextmanager
+async def async_modify_transaction_to_rollback(
+    db: AsyncDbType,
+    expiry: str = "all",
+) -> AsyncGenerator[Tuple[AsyncConnection, AsyncTransaction, AsyncSession], None]:
+    """
+    Create a transactional context for async tests to run in, see
+    modify_transaction_to_rollback.
+    """
+
+    # Start a transaction
+    _session_factory, engine = db
+    connection = await engine.connect()
+    root_transaction = await connection.begin()
+
+    if NATIVE_JOIN_TRANSACTION:
+        session = AsyncSession(
+            **{
+                **_session_factory.kw,
+                "bind": connection,
+                "join_transaction_mode": "create_savepoint",
+            }
+        )
+    else:
+        session = await _begin_legacy_async_session(
+            _session_factory, connection, root_transaction, expiry
+        )
+
+    # Make sure the session can't be closed by accident in the codebase
+    session_force_close = session.close
+
+    async def close() -> None:
+        await session.rollback()
+
+    session.close = close  # type: ignore
+
+    try:
+        yield connection, root_transaction, session
+    finally:
+        if isinstance(session.sync_session, TestSession):
+            session.sync_session.restart_savepoint = None
+
+        # Rollback the transaction and return the connection to the pool
+        await session_force_close()
+        await root_transaction.rollback()
+        await connection.close()
+
+
+@pytest.fixture(scope="session")
+def _async_db() -> Optional[AsyncDbType]:
+    """
+    Override the _async_db fixture to return an async session factory and
+    engine with access to the test database, the same way as the _db fixture.
+    """
+    return None
+
+
+@pytest_asyncio.fixture(scope="function")
+async def _async_session(
+    pytestconfig: Config,
+    _async_db: Optional[AsyncDbType],
+) -> AsyncGenerator[Optional[AsyncSession], None]:
+    if _async_db is None:
+        yield None
+        return
+
+    async with async_modify_transaction_to_rollback(
+        _async_db, pytestconfig._savepoint_expiry  # type: ignore
+    ) as db:
+        _, _, session = db
+        yield session
+
+
+@pytest.fixture(scope="session")
+def _async_session_router(
+    _session_router: SessionRouter, _async_db: Optional[AsyncDbType]
+) -> SessionRouter:
+    """Route the async session factory of _async_db along with the sync ones."""
+    if _async_db is not None:
+        _session_router.register(_async_db[0])
+
+    return _session_router
+
+
+@pytest.fixture(scope="function")
+def _auto_mock_async_session_by_marker(
+    request: FixtureRequest, _auto_mock_session_by_marker: None
+) -> None:
+    """
+    Route the async session factory of _async_db in async tests to the
+    transactional async session of the test, the other factories keep the route
+    of the sync ones.
+
+    Requested only by the marked async tests, see pytest_collection_modifyitems.
+    Unlike the sync one, the context is opened before the test: it can't be
+    set up from the running event loop of the test.
+    """
+    if not get_db_markers(
+        request.node
+    ).sqlalchemy_db or not inspect.iscoroutinefunction(request.function):
+        return
+
+    session = request.getfixturevalue("_async_session")
+
+    if session is None:
+        return
+
+    request.getfixturevalue("_async_session_router")
+    async_factory, _ = request.getfixturevalue("_async_db")
+    # Set by _auto_mock_session_by_marker for the sync factories
+    route = typing.cast(Route, session_route.get())
+
+    def _async_route(factory: sessionmaker) -> typing.Any:
+        if factory is async_factory:
+            return session
+
+        return route(factory)
+
+    request.addfinalizer(set_route(_async_route))
+
+
+@pytest.fixture(scope="function")
+def async_db_session(_async_session: Optional[AsyncSession]) -> AsyncSession:
+    """
+    An AsyncSession running in a transactional context, the async counterpart
+    of the db_session fixture.
+    """
+    if _async_session is None:
+        raise NotImplementedError(
+            "_async_db fixture not defined. The pytest-sqlalchemy-session plugin "
+            "requires you to define an _async_db fixture that returns an async session "
+            "factory and engine with access to your test database to use async sessions."
+        )
+
+    return _async_session
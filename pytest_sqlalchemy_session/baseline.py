@@ -0,0 +1,162 @@
+import collections
+import json
+import os
+import typing
+import weakref
+from typing import Dict, Generator, List, Optional
+
+import pluggy
+import pytest
+from pytest import Config, Item, TestReport
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from pytest_sqlalchemy_session.queries import QueryCounter, get_fingerprint
+
+# The queries of a test: {"count": 3, "fingerprints": {"SELECT ...": 2, ...}}
+QueryBaselineEntry = Dict[str, typing.Any]
+
+
+class QueryBaseline:
+    """
+    Compares the queries of the tests with the ones stored in a baseline file,
+    and updates the file from the results of the workers as well with
+    pytest-xdist.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        path: str,
+        update: bool = False,
+        tolerance: int = 0,
+        warn: bool = False,
+    ):
+        self.config = config
+        self.path = path
+        self.update = update
+        self.tolerance = tolerance
+        self.warn = warn
+        self.counter = QueryCounter()
+        self.engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+        self.baseline = read_query_baseline(path)
+        # None for the tests without queries, they are removed from the baseline
+        self.results: Dict[str, Optional[QueryBaselineEntry]] = {}
+
+    def install(self, engine: Engine) -> None:
+        if engine in self.engines:
+            return
+
+        event.listen(engine, "before_cursor_execute", self.counter)
+        self.engines.add(engine)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(
+        self, item: Item
+    ) -> Generator[None, pluggy.Result[None], None]:
+        # Only the queries of the test call, the session fixtures are set up once
+        self.counter.start()
+
+        outcome: pluggy.Result[None] = yield
+
+        self.counter.stop()
+        expected = self.baseline.get(item.nodeid)
+
+        if self.update or expected is None or outcome.excinfo is not None:
+            return
+
+        try:
+            check_query_baseline(expected, self.counter.statements, self.tolerance)
+        except AssertionError as error:
+            if self.warn:
+                item.warn(pytest.PytestWarning(str(error)))
+            else:
+                outcome.force_exception(error)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(
+        self, item: Item
+    ) -> Generator[None, pluggy.Result[TestReport], None]:
+        outcome: pluggy.Result[TestReport] = yield
+        report: TestReport = outcome.get_result()
+
+        if report.when == "call":
+            # Sent to the controller with the report by pytest-xdist workers
+            report.db_queries = make_entry(self.counter.statements)  # type: ignore
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        if report.when == "call" and report.passed and hasattr(report, "db_queries"):
+            entry = report.db_queries  # type: ignore
+            self.results[report.nodeid] = entry if entry["count"] else None
+
+    def pytest_sessionfinish(self) -> None:
+        if not self.update or hasattr(self.config, "workerinput"):
+            return
+
+        # Merge into the baseline, the tests that didn't run keep their entries
+        baseline = dict(self.baseline)
+
+        for nodeid, entry in self.results.items():
+            if entry is None:
+                baseline.pop(nodeid, None)
+            else:
+                baseline[nodeid] = entry
+
+        write_query_baseline(self.path, baseline)
+
+
+def make_entry(statements: List[str]) -> QueryBaselineEntry:
+    fingerprints = collections.Counter(
+        get_fingerprint(statement) for statement in statements
+    )
+
+    return {
+        "count": len(statements),
+        "fingerprints": dict(sorted(fingerprints.items())),
+    }
+
+
+def check_query_baseline(
+    expected: QueryBaselineEntry, statements: List[str], tolerance: int = 0
+) -> None:
+    number = expected["count"] + tolerance
+
+    if len(statements) <= number:
+        return
+
+    raise AssertionError(
+        f"Expected at most {number} queries as in the query baseline, "
+        f"{len(statements)} were executed:\n"
+        + format_fingerprints_diff(expected["fingerprints"], make_entry(statements))
+    )
+
+
+def format_fingerprints_diff(
+    expected: Dict[str, int], entry: QueryBaselineEntry
+) -> str:
+    """The fingerprints executed more times than in the baseline."""
+    diff: typing.Counter[str] = collections.Counter(entry["fingerprints"])
+    diff.subtract(expected)
+
+    return "\n".join(
+        f"{count:>+6} x {fingerprint}"
+        for fingerprint, count in diff.most_common()
+        if count > 0
+    )
+
+
+def read_query_baseline(path: str) -> Dict[str, QueryBaselineEntry]:
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as baseline_file:
+        return json.load(baseline_file)["tests"]
+
+
+def write_query_baseline(path: str, baseline: Dict[str, QueryBaselineEntry]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    # Sorted to keep the diffs of a committed baseline small
+    with open(path, "w") as baseline_file:
+        json.dump({"tests": baseline}, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
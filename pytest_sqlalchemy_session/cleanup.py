@@ -0,0 +1,97 @@
+import re
+import typing
+from typing import List, Optional, Set
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.sql import TableClause
+
+# The target table of INSERT, UPDATE and DELETE statements written as text
+WRITE_STATEMENT_RE = re.compile(
+    r"^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"
+    r"((?:\"[^\"]+\"|[\w$]+)(?:\.(?:\"[^\"]+\"|[\w$]+))?)",
+    re.IGNORECASE,
+)
+
+
+class DirtyTables:
+    """
+    Records the tables written to by the statements executed on an engine, so that
+    only those are cleaned up after a transactional_db test.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        # None while nothing has to be recorded
+        self.tables: Optional[Set[str]] = None
+
+    def start(self) -> None:
+        self.tables = set()
+
+    def stop(self) -> Set[str]:
+        tables, self.tables = self.tables or set(), None
+
+        return tables
+
+    def __call__(
+        self,
+        conn: Connection,
+        cursor: typing.Any,
+        statement: str,
+        parameters: typing.Any,
+        context: Optional[DefaultExecutionContext],
+        executemany: bool,
+    ) -> None:
+        if self.tables is None:
+            return
+
+        table_name = _get_compiled_table_name(context) or _get_text_table_name(
+            statement
+        )
+
+        if table_name is not None:
+            self.tables.add(table_name)
+
+    def cleanup(self) -> None:
+        """Delete the rows of the recorded tables and stop recording."""
+        tables = sorted(self.stop())
+
+        if not tables:
+            return
+
+        with self.engine.begin() as connection:
+            for statement in _get_cleanup_statements(connection, tables):
+                connection.exec_driver_sql(statement)
+
+
+def _get_compiled_table_name(
+    context: Optional[DefaultExecutionContext],
+) -> Optional[str]:
+    compiled = getattr(context, "compiled", None)
+
+    if compiled is None or not (
+        compiled.isinsert or compiled.isupdate or compiled.isdelete
+    ):
+        return None
+
+    table = getattr(compiled.statement, "table", None)
+
+    if not isinstance(table, TableClause):
+        return None
+
+    return compiled.preparer.format_table(table)
+
+
+def _get_text_table_name(statement: str) -> Optional[str]:
+    match = WRITE_STATEMENT_RE.match(statement)
+
+    return match.group(1) if match else None
+
+
+def _get_cleanup_statements(connection: Connection, tables: List[str]) -> List[str]:
+    if connection.dialect.name == "postgresql":
+        # A single statement for all tables, restarting their sequences
+        return [f"TRUNCATE TABLE {', '.join(tables)} RESTART IDENTITY CASCADE"]
+
+    # DELETE is faster than TRUNCATE for small tables, and the only way on SQLite
+    return [f"DELETE FROM {table}" for table in tables]
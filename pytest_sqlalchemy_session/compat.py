@@ -0,0 +1,6 @@
+from packaging.version import Version
+from sqlalchemy import __version__ as sqlalchemy_version
+
+# SQLAlchemy 2.0 joins a session to an external transaction with savepoints
+# natively, see Session(join_transaction_mode="create_savepoint")
+NATIVE_JOIN_TRANSACTION = Version(sqlalchemy_version) >= Version("2.0")
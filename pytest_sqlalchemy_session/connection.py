@@ -0,0 +1,76 @@
+import typing
+from typing import Optional
+
+from sqlalchemy.engine import Connection, Transaction
+
+
+class TestConnection:
+    """
+    A connection of the application in the transaction of the test: a proxy over
+    the connection of the test session, whose transactions are savepoints.
+
+    Like ``TestSession`` for the ORM, ``commit()`` releases the savepoint and
+    the next statement begins a new one, ``rollback()`` and ``close()`` roll back
+    to it. The connection of the test stays open.
+    """
+
+    def __init__(self, connection: Connection):
+        self._connection = connection
+        self._transaction: Optional[Transaction] = None
+        # The statements of a legacy connection of SQLAlchemy 1.4 autocommit
+        # outside of a transaction, into the transaction of the test then
+        self._autobegin = getattr(connection, "_is_future", True)
+        self.closed = False
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self._connection, name)
+
+    def __enter__(self) -> "TestConnection":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def begin(self) -> Transaction:
+        self._transaction = self._connection.begin_nested()
+
+        return self._transaction
+
+    def in_transaction(self) -> bool:
+        return self._transaction is not None and self._transaction.is_active
+
+    def commit(self) -> None:
+        if self.in_transaction():
+            typing.cast(Transaction, self._transaction).commit()
+
+    def rollback(self) -> None:
+        if self.in_transaction():
+            typing.cast(Transaction, self._transaction).rollback()
+
+    def close(self) -> None:
+        self.rollback()
+        self.closed = True
+
+    def execute(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self._begin_implicitly()
+
+        return self._connection.execute(*args, **kwargs)
+
+    def exec_driver_sql(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self._begin_implicitly()
+
+        return self._connection.exec_driver_sql(*args, **kwargs)
+
+    def scalar(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self._begin_implicitly()
+
+        return self._connection.scalar(*args, **kwargs)
+
+    def scalars(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self._begin_implicitly()
+
+        return self._connection.scalars(*args, **kwargs)
+
+    def _begin_implicitly(self) -> None:
+        if self._autobegin and not self.in_transaction():
+            self.begin()
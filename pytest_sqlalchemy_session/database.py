@@ -0,0 +1,396 @@
+import contextlib
+import hashlib
+import os
+from typing import Callable, Generator, List, Optional, Union
+
+from pytest import UsageError
+from sqlalchemy import (
+    Column,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from pytest_sqlalchemy_session.sqlite import create_sqlite_engine, is_memory_url
+
+# Creates the schema of the test database, e.g. metadata.create_all or a function
+# running the Alembic migrations on the connection
+SchemaSetup = Callable[[Connection], None]
+
+TEMPLATE_SUFFIX = "_template_"
+
+# Holds the fingerprint of the schema of a database reused across runs
+schema_table = Table(
+    "pytest_sqlalchemy_session_schema",
+    MetaData(),
+    Column("fingerprint", String(64), nullable=False),
+)
+
+# Maintenance databases to connect to for CREATE/DROP DATABASE
+MAINTENANCE_DATABASES = {"postgresql": "postgres", "mysql": None}
+
+DATABASE_EXISTS_QUERIES = {
+    "postgresql": "SELECT 1 FROM pg_database WHERE datname = :name",
+    "mysql": "SELECT 1 FROM information_schema.schemata WHERE schema_name = :name",
+}
+
+
+def get_worker_id() -> Optional[str]:
+    """The id of the pytest-xdist worker (gw0, gw1, ...), None without xdist."""
+    return os.environ.get("PYTEST_XDIST_WORKER")
+
+
+def get_worker_url(url: Union[str, URL], worker_id: Optional[str] = None) -> URL:
+    """The URL of the database of the worker: the database name gets the worker id."""
+    url = make_url(url)
+
+    # The in-memory databases of the workers are separate already
+    if worker_id is None or is_memory_url(url):
+        return url
+
+    return url.set(database=f"{url.database}_{worker_id}")
+
+
+def get_template_url(url: Union[str, URL], schema_key: str) -> URL:
+    """The URL of the template database holding the schema with the key."""
+    url = make_url(url)
+
+    return url.set(database=f"{url.database}{TEMPLATE_SUFFIX}{schema_key[:16]}")
+
+
+def metadata_hash(metadata: MetaData) -> str:
+    """A key of the schema of the metadata: the hash of its PostgreSQL DDL."""
+    dialect = postgresql.dialect()
+    digest = hashlib.sha256()
+
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+
+        for index in sorted(table.indexes, key=lambda index: str(index.name)):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def provision_database(
+    url: URL,
+    setup: Optional[SchemaSetup] = None,
+    template_url: Optional[URL] = None,
+    reuse: bool = False,
+    fingerprint: Optional[str] = None,
+    shared: bool = False,
+) -> Generator[Engine, None, None]:
+    """
+    Create the database if it doesn't exist, set up the schema and drop
+    the database at exit.
+
+    With ``template_url`` the schema is set up once into the template database,
+    and the database is created as its copy. With ``reuse`` the database is kept
+    for the next runs, and rebuilt only when the schema ``fingerprint`` changes.
+    A ``shared`` database is used by several processes, e.g. the pytest-xdist
+    workers: the first one creates it, the last one drops it.
+
+    An in-memory SQLite database lives as long as the engine: the schema is set up
+    on the engine itself, and it's never reused.
+    """
+    if is_memory_url(url):
+        engine = create_sqlite_engine(url)
+        _setup_schema(engine, setup)
+    elif shared:
+        engine = _join_shared_database(url, setup, template_url, reuse, fingerprint)
+    else:
+        engine = _prepare_database(url, setup, template_url, reuse, fingerprint)
+
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+        if not reuse:
+            _release_database(url, shared)
+
+
+def _prepare_database(
+    url: URL,
+    setup: Optional[SchemaSetup],
+    template_url: Optional[URL],
+    reuse: bool,
+    fingerprint: Optional[str],
+) -> Engine:
+    if not reuse or read_fingerprint(url) != (fingerprint or ""):
+        _build_database(url, setup, template_url, rebuild=reuse)
+
+        if reuse:
+            write_fingerprint(url, fingerprint or "")
+
+    if url.get_backend_name() == "sqlite":
+        return create_sqlite_engine(url)
+
+    return create_engine(url)
+
+
+def _join_shared_database(
+    url: URL,
+    setup: Optional[SchemaSetup],
+    template_url: Optional[URL],
+    reuse: bool,
+    fingerprint: Optional[str],
+) -> Engine:
+    if url.get_backend_name() != "postgresql":
+        raise UsageError("Shared databases are supported only by PostgreSQL.")
+
+    with _maintenance_connection(url) as connection, _advisory_lock(
+        connection, url.database
+    ):
+        # The processes wait for the one setting the database up
+        if reuse or not _database_exists(connection, url):
+            engine = _prepare_database(url, setup, template_url, reuse, fingerprint)
+        else:
+            engine = create_engine(url)
+
+        # A connection left in the pool keeps the database from being dropped
+        # by a process leaving meanwhile
+        engine.connect().close()
+
+    return engine
+
+
+def _release_database(url: URL, shared: bool) -> None:
+    if not shared:
+        drop_database(url)
+        return
+
+    with _maintenance_connection(url) as connection, _advisory_lock(
+        connection, url.database
+    ):
+        # Dropped by the last process leaving it
+        if not _has_connections(connection, url):
+            drop_database(url)
+
+
+def read_fingerprint(url: URL) -> Optional[str]:
+    """The fingerprint of the schema of the database, None if it's unknown."""
+    if not database_exists(url):
+        return None
+
+    engine = create_engine(url)
+
+    try:
+        with engine.connect() as connection:
+            if not inspect(connection).has_table(schema_table.name):
+                return None
+
+            return connection.execute(select(schema_table.c.fingerprint)).scalar()
+    finally:
+        engine.dispose()
+
+
+def write_fingerprint(url: URL, fingerprint: str) -> None:
+    engine = create_engine(url)
+
+    try:
+        with engine.begin() as connection:
+            schema_table.create(connection, checkfirst=True)
+            connection.execute(schema_table.delete())
+            connection.execute(schema_table.insert(), {"fingerprint": fingerprint})
+    finally:
+        engine.dispose()
+
+
+def _build_database(
+    url: URL,
+    setup: Optional[SchemaSetup],
+    template_url: Optional[URL],
+    rebuild: bool,
+) -> None:
+    if rebuild:
+        drop_database(url)
+
+    if template_url is not None:
+        create_database_from_template(url, template_url, setup)
+        return
+
+    create_database(url)
+
+    if setup is None:
+        return
+
+    engine = create_engine(url)
+
+    try:
+        _setup_schema(engine, setup)
+    finally:
+        engine.dispose()
+
+
+def _setup_schema(engine: Engine, setup: Optional[SchemaSetup]) -> None:
+    if setup is None:
+        return
+
+    with engine.begin() as connection:
+        setup(connection)
+
+
+def create_database_from_template(
+    url: URL, template_url: URL, setup: Optional[SchemaSetup] = None
+) -> None:
+    """
+    Create the database as a copy of the template database, building the template
+    first if it doesn't exist. Any stale database with the same name is dropped.
+    """
+    if url.get_backend_name() != "postgresql":
+        raise UsageError("Template databases are supported only by PostgreSQL.")
+
+    with _maintenance_connection(url) as connection, _advisory_lock(
+        connection, template_url.database
+    ):
+        # Workers wait for the one building the template
+        if not _database_exists(connection, template_url):
+            _build_template(connection, template_url, setup)
+
+        if _database_exists(connection, url):
+            connection.execute(text(f"DROP DATABASE {_quote(connection, url)}"))
+
+        connection.execute(
+            text(
+                f"CREATE DATABASE {_quote(connection, url)} "
+                f"TEMPLATE {_quote(connection, template_url)}"
+            )
+        )
+
+
+def drop_template_databases(url: Union[str, URL]) -> None:
+    """Drop all template databases of the database."""
+    url = make_url(url)
+
+    with _maintenance_connection(url) as connection:
+        for template_url in _get_template_urls(connection, url):
+            drop_database(template_url)
+
+
+def database_exists(url: URL) -> bool:
+    if url.get_backend_name() == "sqlite":
+        return not is_memory_url(url) and os.path.exists(str(url.database))
+
+    with _maintenance_connection(url) as connection:
+        return _database_exists(connection, url)
+
+
+def create_database(url: URL) -> None:
+    if url.get_backend_name() == "sqlite":
+        # The file is created on the first connection
+        return
+
+    with _maintenance_connection(url) as connection:
+        if not _database_exists(connection, url):
+            connection.execute(text(f"CREATE DATABASE {_quote(connection, url)}"))
+
+
+def drop_database(url: URL) -> None:
+    if url.get_backend_name() == "sqlite":
+        if not is_memory_url(url) and os.path.exists(str(url.database)):
+            os.remove(url.database)
+
+        return
+
+    with _maintenance_connection(url) as connection:
+        if _database_exists(connection, url):
+            connection.execute(text(f"DROP DATABASE {_quote(connection, url)}"))
+
+
+@contextlib.contextmanager
+def _maintenance_connection(url: URL) -> Generator[Connection, None, None]:
+    backend_name = url.get_backend_name()
+
+    if backend_name not in MAINTENANCE_DATABASES:
+        raise UsageError(
+            f"Creating {backend_name} databases isn't supported, "
+            "override the _db fixture to provide the test database."
+        )
+
+    engine = create_engine(
+        url.set(database=MAINTENANCE_DATABASES[backend_name]),
+        isolation_level="AUTOCOMMIT",
+    )
+
+    try:
+        with engine.connect() as connection:
+            yield connection
+    finally:
+        engine.dispose()
+
+
+def _database_exists(connection: Connection, url: URL) -> bool:
+    query = DATABASE_EXISTS_QUERIES[url.get_backend_name()]
+
+    return connection.execute(text(query), {"name": url.database}).scalar() is not None
+
+
+def _has_connections(connection: Connection, url: URL) -> bool:
+    query = text("SELECT 1 FROM pg_stat_activity WHERE datname = :name LIMIT 1")
+
+    return connection.execute(query, {"name": url.database}).scalar() is not None
+
+
+def _quote(connection: Connection, url: URL) -> str:
+    return connection.dialect.identifier_preparer.quote(url.database)
+
+
+def _build_template(
+    connection: Connection, template_url: URL, setup: Optional[SchemaSetup]
+) -> None:
+    # Templates of the previous versions of the schema aren't needed anymore
+    base_url = template_url.set(
+        database=template_url.database.rsplit(TEMPLATE_SUFFIX, 1)[0]
+    )
+
+    for stale_url in _get_template_urls(connection, base_url):
+        connection.execute(text(f"DROP DATABASE {_quote(connection, stale_url)}"))
+
+    connection.execute(text(f"CREATE DATABASE {_quote(connection, template_url)}"))
+
+    # Copying a database requires no connections to it, dispose the engine
+    engine = create_engine(template_url)
+
+    try:
+        if setup is not None:
+            with engine.begin() as template_connection:
+                setup(template_connection)
+    except BaseException:
+        engine.dispose()
+        connection.execute(text(f"DROP DATABASE {_quote(connection, template_url)}"))
+        raise
+
+    engine.dispose()
+
+
+def _get_template_urls(connection: Connection, url: URL) -> List[URL]:
+    prefix = f"{url.database}{TEMPLATE_SUFFIX}"
+    query = text(
+        "SELECT datname FROM pg_database WHERE left(datname, length(:prefix)) = :prefix"
+    )
+
+    return [
+        url.set(database=name)
+        for name in connection.execute(query, {"prefix": prefix}).scalars()
+    ]
+
+
+@contextlib.contextmanager
+def _advisory_lock(connection: Connection, name: str) -> Generator[None, None, None]:
+    connection.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": name})
+
+    try:
+        yield
+    finally:
+        connection.execute(
+            text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": name}
+        )
@@ -1,32 +1,81 @@
 import contextlib
+import threading
 import typing
-from typing import Callable, Generator, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Generator, List, Mapping, Optional, Tuple
 
 import pytest
 from pytest import Config, FixtureRequest, UsageError
-from pytest_mock import MockFixture
 from sqlalchemy import event
-from sqlalchemy.engine import Connection, Engine, RootTransaction
+from sqlalchemy.engine import URL, Connection, Engine, Transaction
 from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
 from sqlalchemy.sql import ClauseElement
 from sqlalchemy.sql.compiler import Compiled
 
+from pytest_sqlalchemy_session.baseline import QueryBaseline
+from pytest_sqlalchemy_session.cleanup import DirtyTables
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+from pytest_sqlalchemy_session.connection import TestConnection
+from pytest_sqlalchemy_session.database import (
+    SchemaSetup,
+    get_template_url,
+    get_worker_id,
+    get_worker_url,
+    provision_database,
+)
+from pytest_sqlalchemy_session.markers import get_db_markers
+from pytest_sqlalchemy_session.queries import QueryCounter, query_counter_key
+from pytest_sqlalchemy_session.readonly import (
+    ReadOnlyTransaction,
+    readonly_transaction_key,
+    reject_writes,
+)
+from pytest_sqlalchemy_session.report import DbTimeRecorder
+from pytest_sqlalchemy_session.routing import (
+    EngineRoute,
+    Route,
+    RouteVar,
+    SessionRouter,
+    connect,
+    set_engine_route,
+    set_route,
+)
 from pytest_sqlalchemy_session.session import TestSession
+from pytest_sqlalchemy_session.snapshot import SharedSnapshot
+from pytest_sqlalchemy_session.sql_log import SqlLog
+from pytest_sqlalchemy_session.sqlite import DatabaseClones, enable_savepoints
 
 DbType = Tuple[sessionmaker, Engine]
+TransactionContext = typing.ContextManager[Tuple[Connection, Transaction, Session]]
 EventClauseElement = typing.Union[ClauseElement, Compiled, str]
 
+# Set for the tests that aren't allowed to query the database in strict mode,
+# and for the threads they start
+strict_mode_enabled: RouteVar[bool] = RouteVar("strict_mode_enabled")
+
+
+# What is expired when the main nested transaction is restarted: everything,
+# like a commit of the session at the top level, only with expire_on_commit
+# of the session, or only the objects written in the transaction that ended
+EXPIRY_STRATEGIES = ("all", "none", "dirty-only")
+
 
 class RestartSavepoint:
     def __init__(
         self,
-        root_transaction: RootTransaction,
+        root_transaction: Transaction,
         main_nested_transaction: SessionTransaction,
+        expiry: str = "all",
     ):
         self.main_nested_transaction = main_nested_transaction
         self.root_transaction = root_transaction
+        self.expiry = expiry
+        self.suspended = False
 
     def __call__(self, session: Session, trans: SessionTransaction):
+        if self.suspended:
+            return
+
         if self.root_transaction.is_active and (
             getattr(
                 trans, "fake_nested", None
@@ -35,9 +84,7 @@ class RestartSavepoint:
                 trans == self.main_nested_transaction
             )  # need to recreate main nested transaction after close
         ):
-            # ensure that state is expired the way
-            # session.commit() at the top level normally does
-            session.expire_all()
+            self.expire(session, trans)
 
             if (
                 session._trans_context_manager == trans
@@ -48,121 +95,1269 @@ class RestartSavepoint:
             new_nested_transaction = session.begin_nested()
             self.main_nested_transaction = new_nested_transaction
 
+    def expire(self, session: Session, trans: SessionTransaction) -> None:
+        if self.expiry == "dirty-only":
+            # The objects flushed in the transaction, not the whole identity map
+            for state in [*trans._new, *trans._dirty]:
+                instance = state.obj()
 
-@contextlib.contextmanager
-def modify_transaction_to_rollback(  # noqa: C901
-    db: DbType,
-) -> Generator[Tuple[Connection, RootTransaction, Session], None, None]:
+                if instance is not None and instance in session:
+                    session.expire(instance)
+        elif self.expiry == "all" or session.expire_on_commit:
+            # ensure that state is expired the way
+            # session.commit() at the top level normally does
+            session.expire_all()
+
+    def suspend(self, session: Session) -> None:
+        """
+        Release the nested transactions and stop restarting the main one, so that
+        inner layers can begin their own savepoints on the same connection.
+        """
+        self.suspended = True
+
+        while session.in_nested_transaction():
+            session.commit()
+
+    def discard(self, session: Session) -> None:
+        """
+        Nothing to do when the layer on top is rolled back: a suspended session
+        joins the outer transaction without savepoints.
+        """
+
+
+class JoinedSavepoint:
     """
-    Create a transactional context for tests to run in.
+    The savepoints of a session joined to the connection natively, with
+    ``join_transaction_mode="create_savepoint"`` of SQLAlchemy 2.0.
     """
 
-    # Start a transaction
-    _session_factory, engine = db
-    connection = engine.connect()
-    root_transaction = connection.begin()
+    def suspend(self, session: Session) -> None:
+        """Release the savepoint of the session, it begins a new one on next use."""
+        if session.in_transaction():
+            session.commit()
+
+    def discard(self, session: Session) -> None:
+        """
+        Close the transaction the session began in the layer on top, its savepoint
+        is already rolled back together with the layer.
+        """
+        transaction = session.get_transaction()
+
+        if transaction is not None:
+            transaction.close()
+
+
+SessionSavepoint = typing.Union[RestartSavepoint, JoinedSavepoint]
+
+
+class SavepointScope:
+    """
+    A module or class scope of the shared connection: a savepoint and the sessions
+    seeding data in it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sessions: List[Tuple[Session, SessionSavepoint]] = []
+
+    def suspend(self) -> None:
+        for session, savepoint in self.sessions:
+            savepoint.suspend(session)
+
+    def discard(self) -> None:
+        for session, savepoint in self.sessions:
+            savepoint.discard(session)
+
+    def expire(self) -> None:
+        for session, _ in self.sessions:
+            session.expire_all()
+
+
+class SharedConnection:
+    """
+    A connection with an outer transaction shared by the tests of the session.
+
+    The connection is opened on first use. Module and class scopes push their own
+    savepoints on it, and each test runs inside a savepoint on top of them that is
+    rolled back to at teardown, instead of checking a connection out of the pool
+    and beginning a root transaction. The test savepoint survives the rollback,
+    so it is emitted only once for consecutive tests.
+
+    With a ``snapshot`` the outer transaction begins from the shared snapshot.
+    The test savepoint is emitted right before the first statement of a test,
+    and a test that executed nothing isn't rolled back to it.
+    """
+
+    savepoint_name = "pytest_sqlalchemy_session"
+
+    def __init__(self, engine: Engine, snapshot: Optional[SharedSnapshot] = None):
+        self.engine = engine
+        self.snapshot = snapshot
+        self.connection: Optional[Connection] = None
+        self.transaction: Optional[Transaction] = None
+        self.scopes: List[SavepointScope] = []
+        self._has_test_savepoint = False
+        self._in_test = False
+        self._executed = False
+
+    @property
+    def in_scope(self) -> bool:
+        return bool(self.scopes)
+
+    @contextlib.contextmanager
+    def begin_scope(self) -> Generator[Tuple[Connection, Transaction], None, None]:
+        connection, transaction = self._begin()
+        self._suspend_scopes()
+
+        if self._has_test_savepoint:
+            self._execute(f"RELEASE SAVEPOINT {self.savepoint_name}")
+            self._has_test_savepoint = False
+
+        scope = SavepointScope(f"{self.savepoint_name}_{len(self.scopes)}")
+        self._execute(f"SAVEPOINT {scope.name}")
+        self.scopes.append(scope)
+
+        try:
+            yield connection, transaction
+        finally:
+            self._rollback_scope(scope)
+
+    @contextlib.contextmanager
+    def begin_test(self) -> Generator[Tuple[Connection, Transaction], None, None]:
+        connection, transaction = self._begin()
+        self._suspend_scopes()
+        self._in_test = True
+
+        try:
+            yield connection, transaction
+        finally:
+            self._rollback_test()
+
+    def add_scope_session(self, session: Session, savepoint: SessionSavepoint) -> None:
+        self.scopes[-1].sessions.append((session, savepoint))
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+
+        self._transaction.rollback()
+        self.connection.close()
+
+    @property
+    def _connection(self) -> Connection:
+        assert self.connection is not None  # nosec
+
+        return self.connection
 
-    session_factory = sessionmaker(**_session_factory.kw, class_=TestSession)
+    @property
+    def _transaction(self) -> Transaction:
+        assert self.transaction is not None  # nosec
 
-    session = session_factory()
+        return self.transaction
 
-    # Make sure the session can't be closed by accident in the codebase
-    session_force_close = session.close
+    def _begin(self) -> Tuple[Connection, Transaction]:
+        if self.connection is None:
+            enable_savepoints(self.engine)
+            self.connection = connect(self.engine)
 
-    def close() -> None:
-        session.rollback()
+            if self.snapshot is not None:
+                self.snapshot.install(self.connection)
 
-    session.close = close
+            self.transaction = self.connection.begin()
+            event.listen(
+                self.connection, "before_cursor_execute", self._before_cursor_execute
+            )
+
+        return self._connection, self._transaction
+
+    def _suspend_scopes(self) -> None:
+        for scope in self.scopes:
+            scope.suspend()
+
+    def _rollback_scope(self, scope: SavepointScope) -> None:
+        if scope not in self.scopes:
+            # The outer transaction was restarted, the savepoint is already gone
+            return
+
+        self._cancel_nested_transactions()
+        self._execute(f"ROLLBACK TO SAVEPOINT {scope.name}")
+        self._execute(f"RELEASE SAVEPOINT {scope.name}")
+        index = self.scopes.index(scope)
+        del self.scopes[index:]
+        self._has_test_savepoint = False
+
+    def _before_cursor_execute(self, *args: typing.Any) -> None:
+        if self._in_test and not self._has_test_savepoint:
+            self._execute(f"SAVEPOINT {self.savepoint_name}")
+            self._has_test_savepoint = True
+
+        self._executed = True
+
+    def _rollback_test(self) -> None:
+        self._in_test = False
+
+        if not self._transaction.is_active:
+            # The outer transaction was ended by the code under test
+            self._transaction.rollback()
+            self.transaction = self._connection.begin()
+            self.scopes.clear()
+            self._has_test_savepoint = False
+            self._executed = False
+            return
+
+        self._cancel_nested_transactions()
+
+        if self._has_test_savepoint and self._executed:
+            self._execute(f"ROLLBACK TO SAVEPOINT {self.savepoint_name}")
+            self._executed = False
+
+        for scope in self.scopes:
+            scope.expire()
+
+    def _cancel_nested_transactions(self) -> None:
+        _cancel_nested_transactions(self._connection)
+
+        for scope in self.scopes:
+            scope.discard()
+
+    def _execute(self, statement: str) -> None:
+        # Use the DBAPI cursor, so the housekeeping isn't visible to engine events
+        cursor = self._connection.connection.cursor()
+
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+class ThreadSessions:
+    """
+    The sessions of the threads started by a test, on the connection of the test
+    session so that they see each other's data and are rolled back with it.
+
+    The test thread keeps the test session, and each call of the session factory
+    from another thread returns a new session whose transactions run in savepoints
+    of their own. The savepoints of a connection are a stack, so the threads take
+    turns: a thread holds the lock of the connection while it has savepoints open,
+    from the first statement of a transaction to its commit or rollback, and the
+    statements of the test thread wait for it as well. Waiting longer than
+    ``timeout`` seconds raises an error instead of hanging the test.
+    """
+
+    def __init__(
+        self, session_factory: sessionmaker, session: Session, timeout: float = 30
+    ):
+        self.session_factory = session_factory
+        self.session = session
+        self.timeout = timeout
+        self.connection = session.connection()
+        self.thread = threading.current_thread()
+        self.sessions: List[Session] = []
+        self.lock = threading.Lock()
+        self.owner: Optional[threading.Thread] = None
+        # The savepoints the owner has open on the connection
+        self.depth = 0
+
+        event.listen(self.connection, "savepoint", self._savepoint)
+        event.listen(self.connection, "release_savepoint", self._end_savepoint)
+        event.listen(self.connection, "rollback_savepoint", self._end_savepoint)
+        event.listen(self.connection, "before_cursor_execute", self._before_execute)
+        event.listen(self.connection, "after_cursor_execute", self._after_execute)
+        event.listen(self.connection.engine, "handle_error", self._handle_error)
+
+    def get_session(self) -> Session:
+        if threading.current_thread() is self.thread:
+            return self.session
+
+        session = self._begin_session()
+        self.sessions.append(session)
+
+        return session
+
+    def close(self) -> None:
+        """Close the sessions the threads have left open."""
+        # Their threads are done, the test thread takes the connection over
+        event.remove(self.connection, "savepoint", self._savepoint)
+        event.remove(self.connection, "release_savepoint", self._end_savepoint)
+        event.remove(self.connection, "rollback_savepoint", self._end_savepoint)
+        event.remove(self.connection, "before_cursor_execute", self._before_execute)
+        event.remove(self.connection, "after_cursor_execute", self._after_execute)
+        event.remove(self.connection.engine, "handle_error", self._handle_error)
+
+        for session in self.sessions:
+            session.close()
+
+    def _begin_session(self) -> Session:
+        session_kw = dict(self.session_factory.kw)
+        session_kw.pop("bind", None)
+
+        if NATIVE_JOIN_TRANSACTION:
+            session, _ = _begin_joined_session(
+                self.session_factory, session_kw, self.connection
+            )
+        else:
+            session = self.session_factory.class_(**session_kw, bind=self.connection)
+            event.listen(session, "after_transaction_create", self._begin_transaction)
+
+        return session
+
+    def _begin_transaction(
+        self, session: Session, transaction: SessionTransaction
+    ) -> None:
+        if transaction.parent is not None:
+            return
+
+        # The session transaction joins the innermost savepoint, this one of the
+        # thread, so that its commit releases the savepoint and keeps the data
+        self.connection.begin_nested()
+        session.connection()
+
+    def _savepoint(self, *args: typing.Any) -> None:
+        if threading.current_thread() is self.thread:
+            return
+
+        self._acquire()
+        self.depth += 1
+
+    def _end_savepoint(self, *args: typing.Any) -> None:
+        # The lock is released after the statement, see _after_execute
+        if threading.current_thread() is not self.thread:
+            self.depth -= 1
+
+    def _before_execute(self, *args: typing.Any) -> None:
+        # The sessions left open by the threads that are done are closed by the test
+        if threading.current_thread() is self.thread and self.owner is not None:
+            if not self.owner.is_alive():
+                return
+
+        self._acquire()
+
+    def _after_execute(self, *args: typing.Any) -> None:
+        if self.owner is threading.current_thread() and not self.depth:
+            self.owner = None
+            self.lock.release()
+
+    def _handle_error(self, context: typing.Any) -> None:
+        if context.connection is self.connection:
+            self._after_execute()
+
+    def _acquire(self) -> None:
+        if self.owner is threading.current_thread():
+            return
+
+        if not self.lock.acquire(timeout=self.timeout):
+            raise UsageError(
+                "The connection of the test has been held by another thread for "
+                f"{self.timeout} seconds. The threads of a test marked "
+                "sqlalchemy_db(threads=True) take turns: a thread holds the connection "
+                "until it commits or rolls back its transaction. See the "
+                "db-threads-timeout option."
+            )
+
+        self.owner = threading.current_thread()
+
+
+@contextlib.contextmanager
+def _begin_root_transaction(
+    engine: Engine, snapshot: Optional[SharedSnapshot] = None
+) -> Generator[Tuple[Connection, Transaction], None, None]:
+    enable_savepoints(engine)
+    connection = connect(engine)
+
+    if snapshot is not None:
+        snapshot.install(connection)
+
+    root_transaction = connection.begin()
+
+    try:
+        yield connection, root_transaction
+    finally:
+        # Rollback the transaction and return the connection to the pool
+        root_transaction.rollback()
+        connection.close()
+
+
+def _begin_legacy_session(
+    session_kw: typing.Dict[str, typing.Any],
+    root_transaction: Transaction,
+    expiry: str = "all",
+) -> Tuple[Session, RestartSavepoint]:
+    # Instantiate the session directly: sessionmaker.__call__ may already be
+    # patched to open the transactional context lazily
+    session = TestSession(**session_kw)
 
     # Begin a nested transaction (any new transactions created in the codebase
     # will be held until this outer transaction is committed or closed)
     main_nested_transaction = session.begin_nested()
-    # Each time the SAVEPOINT for the nested transaction ends, reopen it
 
+    # Each time the SAVEPOINT for the nested transaction ends, reopen it
     restart_savepoint = RestartSavepoint(
         root_transaction=root_transaction,
         main_nested_transaction=main_nested_transaction,
+        expiry=expiry,
     )
+    session.restart_savepoint = restart_savepoint
 
-    event.listens_for(session, "after_transaction_end")(restart_savepoint)
+    return session, restart_savepoint
 
-    try:
-        yield connection, root_transaction, session
-    finally:
-        event.remove(session, "after_transaction_end", restart_savepoint)
-        # Rollback the transaction and return the connection to the pool
-        session_force_close()
-        root_transaction.rollback()
-        connection.close()
+
+def _begin_joined_session(
+    session_factory: sessionmaker,
+    session_kw: typing.Dict[str, typing.Any],
+    connection: Connection,
+) -> Tuple[Session, JoinedSavepoint]:
+    # The session releases and rolls back its own savepoints of the connection,
+    # no need to restart them on every transaction end
+    session = session_factory.class_(
+        **session_kw, bind=connection, join_transaction_mode="create_savepoint"
+    )
+
+    return session, JoinedSavepoint()
+
+
+@contextlib.contextmanager
+def modify_transaction_to_rollback(  # noqa: C901
+    db: DbType,
+    shared_connection: Optional[SharedConnection] = None,
+    scoped: bool = False,
+    expiry: str = "all",
+    snapshot: Optional[SharedSnapshot] = None,
+) -> Generator[Tuple[Connection, Transaction, Session], None, None]:
+    """
+    Create a transactional context for tests to run in.
+
+    With ``shared_connection`` the context is a savepoint of the connection shared
+    by the whole session instead of a connection of its own. A ``scoped`` context
+    is a module or class layer: tests run in inner savepoints on top of it.
+    ``expiry`` is one of EXPIRY_STRATEGIES, for the sessions of SQLAlchemy 1.4:
+    the sessions of 2.0 expire their objects on commit by expire_on_commit.
+    The root transaction begins from the shared ``snapshot`` if given.
+    """
+
+    # Start a transaction
+    _session_factory, engine = db
+    session_kw = dict(_session_factory.kw)
+
+    if shared_connection is None:
+        transaction_context = _begin_root_transaction(engine, snapshot)
+    elif scoped:
+        transaction_context = shared_connection.begin_scope()
+    else:
+        transaction_context = shared_connection.begin_test()
+
+    with transaction_context as (connection, root_transaction):
+        session: Session
+        savepoint: SessionSavepoint
+
+        if NATIVE_JOIN_TRANSACTION:
+            session_kw.pop("bind", None)
+            session, savepoint = _begin_joined_session(
+                _session_factory, session_kw, connection
+            )
+        else:
+            session_kw["bind"] = connection
+            session, savepoint = _begin_legacy_session(
+                session_kw, root_transaction, expiry
+            )
+
+        # Make sure the session can't be closed by accident in the codebase
+        session_force_close = session.close
+
+        def close() -> None:
+            session.rollback()
+
+        session.close = close
+
+        if scoped and shared_connection is not None:
+            shared_connection.add_scope_session(session, savepoint)
+
+        try:
+            yield connection, root_transaction, session
+        finally:
+            if isinstance(session, TestSession):
+                session.restart_savepoint = None
+
+            if not scoped:
+                # Rolled back with the test, the session doesn't have to
+                _cancel_nested_transactions(connection)
+
+            session_force_close()
+
+
+def _cancel_nested_transactions(connection: Connection) -> None:
+    # Savepoints begun by the sessions are discarded by rolling back to
+    # a savepoint below them, only the bookkeeping of the connection is left
+    nested_transaction = connection.get_nested_transaction()
+
+    if nested_transaction is not None:
+        nested_transaction._cancel()
+
+
+@pytest.fixture(scope="session")
+def _db_url() -> Optional[typing.Union[str, URL]]:
+    """
+    Override the _db_url fixture to return the URL of the test database, and
+    the plugin creates a database of its own for each pytest-xdist worker.
+    """
+    return None
+
+
+@pytest.fixture(scope="session")
+def _db_setup() -> Optional[SchemaSetup]:
+    """
+    Override the _db_setup fixture to return a callable setting up the schema
+    of the database created from _db_url, e.g. ``metadata.create_all``.
+    """
+    return None
+
+
+@pytest.fixture(scope="session")
+def _db_schema_key() -> Optional[str]:
+    """
+    Override the _db_schema_key fixture to return a key of the schema, e.g.
+    ``metadata_hash(metadata)`` or the migration head. The schema is then set up
+    once into a PostgreSQL template database, rebuilt only when the key changes,
+    and the databases are created as its copies. With ``--reuse-db`` the key is
+    the fingerprint telling whether the database of the last run can be reused.
+    """
+    return None
+
+
+@pytest.fixture(scope="session")
+def _db_app() -> Optional[DbType]:
+    """
+    Override the _db_app fixture to return the session factory and engine of the
+    application, e.g. ``session_factory, engine``. For the session, the factory is
+    bound to the database created from _db_url, and ``connect()`` and ``begin()``
+    of the engine return its connections, so the code of the application reaches
+    it rather than the database it is configured with.
+    """
+    return None
 
 
 @pytest.fixture(scope="session")
-def _db() -> DbType:
+def _db(
+    pytestconfig: Config,
+    _db_url: Optional[typing.Union[str, URL]],
+    _db_setup: Optional[SchemaSetup],
+    _db_schema_key: Optional[str],
+    _db_app: Optional[DbType],
+) -> Generator[DbType, None, None]:
     """
     A user-defined _db fixture is required to provide the plugin with a SQLAlchemy
     Session object that can access the test database. If the user hasn't defined
-    that fixture, raise an error.
+    that fixture or the _db_url one, raise an error.
     """
-    msg = (
-        "_db fixture not defined. The pytest-sqlalchemy-session plugin "
-        "requires you to define a _db fixture that returns a session factory and engine "
-        "with access to your test database. For more information, see the plugin "
-        "documentation."
-    )
+    if _db_url is None:
+        msg = (
+            "_db fixture not defined. The pytest-sqlalchemy-session plugin "
+            "requires you to define a _db fixture that returns a session factory and engine "
+            "with access to your test database. For more information, see the plugin "
+            "documentation."
+        )
 
-    raise NotImplementedError(msg)
+        raise NotImplementedError(msg)
 
+    if pytestconfig._reuse_db and _db_schema_key is None:  # type: ignore
+        # Without the fingerprint a database of an older schema would be reused
+        raise UsageError(
+            "--reuse-db requires the _db_schema_key fixture, e.g. returning "
+            "metadata_hash(metadata) or the migration head."
+        )
 
-@pytest.fixture(scope="function", autouse=True)
-def _strict_session_rule(
-    pytestconfig: Config, request: FixtureRequest, _db: DbType
-) -> None:
-    enable_strict = pytestconfig._enable_strict  # type: ignore
-    session_factory, engine = _db
-    transactional_marker = request.node.get_closest_marker("transactional_db")
+    # The workers share one database from a snapshot, or have their own
+    shared = pytestconfig._shared_db_snapshot  # type: ignore
+    url = get_worker_url(_db_url, None if shared else get_worker_id())
+    template_url = None
 
-    if not enable_strict or transactional_marker:
-        return
+    if _db_schema_key is not None and url.get_backend_name() == "postgresql":
+        template_url = get_template_url(_db_url, _db_schema_key)
 
-    db_marker = request.node.get_closest_marker("sqlalchemy_db")
+    with provision_database(
+        url,
+        _db_setup,
+        template_url,
+        reuse=pytestconfig._reuse_db,  # type: ignore
+        fingerprint=_db_schema_key,
+        shared=shared,
+    ) as engine, _bind_app(_db_app, engine) as db:
+        yield db
 
-    if db_marker:
+
+@contextlib.contextmanager
+def _bind_app(app: Optional[DbType], engine: Engine) -> Generator[DbType, None, None]:
+    if app is None:
+        yield sessionmaker(engine), engine
         return
 
-    @event.listens_for(engine, "before_execute")
-    def raise_error_in_strict_mode(*args, **kwargs) -> None:
+    session_factory, app_engine = app
+    bind = session_factory.kw.get("bind")
+    session_factory.configure(bind=engine)
+
+    # Looked up on each call, the engine may be routed afterwards, see SessionRouter
+    app_engine.connect = lambda *args, **kwargs: engine.connect(*args, **kwargs)  # type: ignore
+    app_engine.begin = lambda *args, **kwargs: engine.begin(*args, **kwargs)  # type: ignore
+
+    try:
+        yield session_factory, engine
+    finally:
+        session_factory.configure(bind=bind)
+        del app_engine.connect
+        del app_engine.begin
+
+
+def _raise_error_in_strict_mode(*args: typing.Any, **kwargs: typing.Any) -> None:
+    if strict_mode_enabled.get():
         raise UsageError(
             "The pytest.mark.sqlalchemy_db or pytest.mark.transactional_db marker is required to execute db queries."
         )
 
-    request.addfinalizer(
-        lambda: event.remove(engine, "before_execute", raise_error_in_strict_mode)
-    )
+
+@pytest.fixture(scope="session")
+def _dbs(_db: DbType) -> Dict[str, DbType]:
+    """
+    Override the _dbs fixture to return the named binds of the application,
+    ``{name: (session_factory, engine)}``, to run each of them in a transactional
+    context of its own. Include _db, the primary database, under any name.
+    """
+    return {"default": _db}
+
+
+@pytest.fixture(scope="session")
+def _strict_session_guard(
+    pytestconfig: Config, _db: DbType, _database_clones: Optional[DatabaseClones]
+) -> Generator[None, None, None]:
+    """
+    Install the strict mode guard on the engine once for the whole session,
+    tests switch it on and off with ``strict_mode_enabled``.
+    """
+    if not pytestconfig._enable_strict:  # type: ignore
+        yield
+        return
+
+    engines = _get_engines(_db, _database_clones)
+
+    for engine in engines:
+        event.listen(engine, "before_execute", _raise_error_in_strict_mode)
+
+    try:
+        yield
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_execute", _raise_error_in_strict_mode)
+
+
+@pytest.fixture(scope="function")
+def _strict_session_rule(pytestconfig: Config, request: FixtureRequest) -> None:
+    """
+    Switch the strict mode on for a test without markers. Requested by those
+    tests only with the strict-db option, see pytest_collection_modifyitems.
+    """
+    enable_strict = pytestconfig._enable_strict  # type: ignore
+    markers = get_db_markers(request.node)
+
+    if not enable_strict or markers.transactional_db or markers.sqlalchemy_db:
+        return
+
+    request.getfixturevalue("_strict_session_guard")
+    request.addfinalizer(strict_mode_enabled.set(True))
+
+
+@pytest.fixture(scope="session")
+def _dirty_tables(
+    pytestconfig: Config, _db: DbType
+) -> Generator[Optional[DirtyTables], None, None]:
+    """
+    Record the tables written to by transactional_db tests with a single listener
+    on the engine for the whole session, if their cleanup is enabled.
+    """
+    if not pytestconfig._transactional_db_cleanup:  # type: ignore
+        yield None
+        return
+
+    _, engine = _db
+    dirty_tables = DirtyTables(engine)
+    event.listen(engine, "before_cursor_execute", dirty_tables)
+
+    try:
+        yield dirty_tables
+    finally:
+        event.remove(engine, "before_cursor_execute", dirty_tables)
+
+
+@pytest.fixture(scope="function")
+def _transactional_db_cleanup(
+    request: FixtureRequest, _dirty_tables: Optional[DirtyTables]
+) -> None:
+    """
+    Clean up the tables a transactional_db test has written to, after all of its
+    fixtures are torn down. Requested by the marked tests only, see
+    pytest_collection_modifyitems.
+    """
+    if _dirty_tables is None or not get_db_markers(request.node).transactional_db:
+        return
+
+    _dirty_tables.start()
+    request.addfinalizer(_dirty_tables.cleanup)
+
+
+@pytest.fixture(scope="session")
+def _query_counter(
+    _db: DbType, _database_clones: Optional[DatabaseClones]
+) -> Generator[QueryCounter, None, None]:
+    """
+    A single query counting listener on the engine, installed on first use.
+    """
+    engines = _get_engines(_db, _database_clones)
+    query_counter = QueryCounter()
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", query_counter)
+
+    try:
+        yield query_counter
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", query_counter)
+
+
+@pytest.fixture(scope="function")
+def db_query_counter(
+    _query_counter: QueryCounter,
+) -> Generator[QueryCounter, None, None]:
+    """
+    Count the queries executed during the test, ``db_query_counter.count``.
+    The SAVEPOINT housekeeping of the transactional context isn't counted.
+    """
+    _query_counter.start()
+
+    try:
+        yield _query_counter
+    finally:
+        _query_counter.stop()
 
 
 @pytest.fixture(scope="function")
-def _session(_db: DbType) -> Generator[Session, None, None]:
-    with modify_transaction_to_rollback(_db) as db:
+def assert_max_queries(
+    db_query_counter: QueryCounter,
+) -> Callable[[int], typing.ContextManager[None]]:
+    """
+    A context manager failing the test if the block executes more queries
+    than the number given, ``with assert_max_queries(3): ...``.
+    """
+    return db_query_counter.assert_max_queries
+
+
+@pytest.fixture(scope="function")
+def _max_queries_by_marker(request: FixtureRequest) -> None:
+    """
+    Count the queries of the tests marked max_queries, the number is checked
+    after the test call by MaxQueries. Requested by the marked tests only, see
+    pytest_collection_modifyitems.
+    """
+    if get_db_markers(request.node).max_queries is None:
+        return
+
+    request.node.stash[query_counter_key] = request.getfixturevalue("db_query_counter")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _db_time_recorder(
+    pytestconfig: Config, request: FixtureRequest
+) -> Optional[DbTimeRecorder]:
+    """
+    Record the database time of the tests on the engine, if the report is enabled.
+    """
+    report = pytestconfig._db_time_report  # type: ignore
+
+    if report is None:
+        return None
+
+    for engine in _request_engines(request):
+        report.recorder.install(engine)
+
+    return report.recorder
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _query_baseline(
+    pytestconfig: Config, request: FixtureRequest
+) -> Optional[QueryBaseline]:
+    """
+    Count the queries of the tests on the engine, if the query baseline is enabled.
+    """
+    baseline = pytestconfig._query_baseline  # type: ignore
+
+    if baseline is None:
+        return None
+
+    for engine in _request_engines(request):
+        baseline.install(engine)
+
+    return baseline
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _sql_log(pytestconfig: Config, request: FixtureRequest) -> Optional[SqlLog]:
+    """
+    Keep the last statements of the tests on the engine, if the SQL log is enabled.
+    """
+    sql_log = pytestconfig._sql_log  # type: ignore
+
+    if sql_log is None:
+        return None
+
+    for engine in _request_engines(request):
+        sql_log.install(engine)
+
+    return sql_log
+
+
+@pytest.fixture(scope="session")
+def _shared_snapshot(
+    pytestconfig: Config, _db: DbType
+) -> Generator[Optional[SharedSnapshot], None, None]:
+    """
+    The snapshot of the seeded database the tests begin from, if the
+    shared-db-snapshot option is enabled.
+    """
+    if not pytestconfig._shared_db_snapshot:  # type: ignore
+        yield None
+        return
+
+    _, engine = _db
+    shared_snapshot = SharedSnapshot(engine)
+
+    try:
+        # Right after joining the database, before the tests commit anything
+        shared_snapshot.export()
+        yield shared_snapshot
+    finally:
+        shared_snapshot.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _auto_db(request: FixtureRequest) -> None:
+    """
+    Set up the database before the first test, whether it uses the database or
+    not: the tests without markers run on it as it is.
+    """
+    request.getfixturevalue("_db")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _auto_shared_snapshot(pytestconfig: Config, request: FixtureRequest) -> None:
+    """
+    Join the shared database and export the snapshot before the first test of
+    the worker, whether it uses the database or not: a test committing in
+    another worker meanwhile would show up in a snapshot exported later.
+    """
+    if pytestconfig._shared_db_snapshot:  # type: ignore
+        request.getfixturevalue("_shared_snapshot")
+
+
+@pytest.fixture(scope="session")
+def _shared_connection(
+    _db: DbType, _shared_snapshot: Optional[SharedSnapshot]
+) -> Generator[SharedConnection, None, None]:
+    """
+    The connection shared by module and class scopes and, in the connection
+    reuse mode, by all tests of the session.
+    """
+    _, engine = _db
+    shared_connection = SharedConnection(engine, _shared_snapshot)
+
+    try:
+        yield shared_connection
+    finally:
+        shared_connection.close()
+
+
+@pytest.fixture(scope="session")
+def _database_clones(
+    pytestconfig: Config, _db: DbType
+) -> Generator[Optional[DatabaseClones], None, None]:
+    """
+    The copies of the SQLite database of _db for the tests, if the clone mode
+    is enabled.
+    """
+    if not pytestconfig._sqlite_db_clone:  # type: ignore
+        yield None
+        return
+
+    _, engine = _db
+    database_clones = DatabaseClones(engine)
+
+    try:
+        yield database_clones
+    finally:
+        database_clones.close()
+
+
+@pytest.fixture(scope="session")
+def _readonly_transaction(
+    pytestconfig: Config, _db: DbType, _shared_snapshot: Optional[SharedSnapshot]
+) -> Generator[ReadOnlyTransaction, None, None]:
+    """
+    The read-only transaction shared by the tests marked
+    ``sqlalchemy_db(readonly=True)``.
+    """
+    _, engine = _db
+    readonly_transaction = ReadOnlyTransaction(engine, _shared_snapshot)
+    # Closed by pytest_runtest_teardown before a test that isn't read-only
+    pytestconfig.stash[readonly_transaction_key] = readonly_transaction
+
+    try:
+        yield readonly_transaction
+    finally:
+        readonly_transaction.close()
+
+
+@pytest.fixture(scope="function")
+def _session(
+    request: FixtureRequest,
+    pytestconfig: Config,
+    _db: DbType,
+    _shared_connection: SharedConnection,
+    _db_time_recorder: Optional[DbTimeRecorder],
+    _database_clones: Optional[DatabaseClones],
+    _readonly_transaction: ReadOnlyTransaction,
+    _shared_snapshot: Optional[SharedSnapshot],
+) -> Generator[Session, None, None]:
+    reuse_connection = pytestconfig._reuse_connection  # type: ignore
+    shared_connection = (
+        _shared_connection if reuse_connection or _shared_connection.in_scope else None
+    )
+    readonly = get_db_markers(request.node).readonly
+    session_context: typing.ContextManager[Session]
+
+    if _database_clones is not None:
+        session_context = _clone_session(_db, _database_clones)
+    elif shared_connection is None and readonly:
+        session_context = _readonly_session(_db, _readonly_transaction)
+    else:
+        session_context = _rollback_session(
+            _db,
+            shared_connection,
+            pytestconfig._savepoint_expiry,  # type: ignore
+            _shared_snapshot,
+            readonly,
+        )
+
+    if _db_time_recorder is not None:
+        session_context = _db_time_recorder.measure_fixture(session_context)
+
+    with session_context as session:
+        yield session
+
+
+@contextlib.contextmanager
+def _rollback_session(
+    db: DbType,
+    shared_connection: Optional[SharedConnection],
+    expiry: str,
+    snapshot: Optional[SharedSnapshot],
+    readonly: bool = False,
+) -> Generator[Session, None, None]:
+    _, engine = db
+    guard = reject_writes(engine) if readonly else contextlib.nullcontext()
+
+    with modify_transaction_to_rollback(
+        db, shared_connection, expiry=expiry, snapshot=snapshot
+    ) as (_, _, session), guard:
+        yield session
+
+
+@contextlib.contextmanager
+def _clone_session(
+    db: DbType, database_clones: DatabaseClones
+) -> Generator[Session, None, None]:
+    # A plain session of a copy of the database: commits, DDL and all are
+    # overwritten by the copy of the next test
+    session_factory, _ = db
+    engine = database_clones.clone()
+
+    with session_factory.class_(**{**session_factory.kw, "bind": engine}) as session:
+        yield session
+
+
+def _get_engines(db: DbType, database_clones: Optional[DatabaseClones]) -> List[Engine]:
+    # The statements of the tests run on the copies in the clone mode
+    _, engine = db
+
+    if database_clones is None:
+        return [engine]
+
+    return [engine, database_clones.engine]
+
+
+def _request_engines(request: FixtureRequest) -> List[Engine]:
+    # Requested by the session fixtures of the enabled options only, _db isn't
+    # looked up again in the setup of every test
+    return _get_engines(
+        request.getfixturevalue("_db"), request.getfixturevalue("_database_clones")
+    )
+
+
+@contextlib.contextmanager
+def _readonly_session(
+    db: DbType, readonly_transaction: ReadOnlyTransaction
+) -> Generator[Session, None, None]:
+    # A plain session of the shared read-only transaction: nothing is written,
+    # so there's nothing to roll back to
+    session_factory, _ = db
+    session_kw = {**session_factory.kw, "bind": readonly_transaction.begin()}
+
+    if NATIVE_JOIN_TRANSACTION:
+        session_kw["join_transaction_mode"] = "rollback_only"
+
+    with session_factory.class_(**session_kw) as session:
+        yield session
+
+
+def _scoped_session(
+    pytestconfig: Config, _db: DbType, _shared_connection: SharedConnection
+) -> Generator[Session, None, None]:
+    with modify_transaction_to_rollback(
+        _db,
+        _shared_connection,
+        scoped=True,
+        expiry=pytestconfig._savepoint_expiry,  # type: ignore
+    ) as db:
         _, _, session = db
         yield session
 
 
-@pytest.fixture(scope="function", autouse=True)
-def _auto_mock_session_by_marker(
-    request: FixtureRequest,
-    _session: Session,
-    mock_session: Callable[[Session], Session],
+@pytest.fixture(scope="module")
+def db_session_module(
+    pytestconfig: Config, _db: DbType, _shared_connection: SharedConnection
+) -> Generator[Session, None, None]:
+    """
+    A session to seed data shared by the tests of a module.
+
+    The data is visible to every test inside the module, each test still rolls
+    back its own changes, and everything is rolled back when the module ends.
+    """
+    yield from _scoped_session(pytestconfig, _db, _shared_connection)
+
+
+@pytest.fixture(scope="class")
+def db_session_class(
+    pytestconfig: Config, _db: DbType, _shared_connection: SharedConnection
+) -> Generator[Session, None, None]:
+    """
+    A session to seed data shared by the tests of a class.
+
+    Works like ``db_session_module``, on top of it if both are used.
+    """
+    yield from _scoped_session(pytestconfig, _db, _shared_connection)
+
+
+def _begin_sessions(
+    stack: contextlib.ExitStack,
+    pool: ThreadPoolExecutor,
+    contexts: Mapping[str, TransactionContext],
+) -> Dict[str, "Future[Tuple[Connection, Transaction, Session]]"]:
+    futures = {}
+
+    for name, context in contexts.items():
+        futures[name] = pool.submit(context.__enter__)
+        # Exited only if entered, on the failure of the other ones as well
+        stack.callback(_exit_context, context, futures[name])
+
+    return futures
+
+
+def _exit_context(
+    context: TransactionContext,
+    future: "Future[Tuple[Connection, Transaction, Session]]",
 ) -> None:
-    if request.node.get_closest_marker("sqlalchemy_db"):
-        mock_session(_session)
+    if future.exception() is None:
+        context.__exit__(None, None, None)
+
+
+@pytest.fixture(scope="session")
+def _sessions_pool(
+    _db: DbType, _dbs: Dict[str, DbType]
+) -> Generator[ThreadPoolExecutor, None, None]:
+    """The threads opening the transactional contexts of the binds of _sessions."""
+    binds = sum(1 for _, engine in _dbs.values() if engine is not _db[1])
+
+    with ThreadPoolExecutor(max_workers=max(binds, 1)) as pool:
+        yield pool
+
+
+@pytest.fixture(scope="function")
+def _sessions(
+    request: FixtureRequest,
+    _db: DbType,
+    _dbs: Dict[str, DbType],
+    _sessions_pool: ThreadPoolExecutor,
+) -> Generator[Dict[str, Session], None, None]:
+    """
+    The sessions of the binds, each in its own transactional context. The
+    contexts are opened concurrently, so each bind doesn't add its connect latency.
+    """
+    _, engine = _db
+    contexts = {
+        name: modify_transaction_to_rollback(
+            db, expiry=request.config._savepoint_expiry  # type: ignore
+        )
+        for name, db in _dbs.items()
+        if db[1] is not engine
+    }
+
+    with contextlib.ExitStack() as stack:
+        futures = _begin_sessions(stack, _sessions_pool, contexts)
+        # The primary database is opened meanwhile, it's shared with _session
+        sessions = {
+            name: request.getfixturevalue("_session")
+            for name, db in _dbs.items()
+            if db[1] is engine
+        }
+
+        for name, future in futures.items():
+            _, _, sessions[name] = future.result()
+
+        yield sessions
+
+
+def _get_bind_names(_db: DbType, _dbs: Dict[str, DbType]) -> Dict[sessionmaker, str]:
+    """The binds other than the primary database, by session factory."""
+    return {
+        session_factory: name
+        for name, (session_factory, engine) in _dbs.items()
+        if engine is not _db[1]
+    }
+
+
+@pytest.fixture(scope="session")
+def _session_router(
+    pytestconfig: Config, _db: DbType, _dbs: Dict[str, DbType]
+) -> Generator[SessionRouter, None, None]:
+    """
+    Route the session factories of _dbs once for the whole session, the tests
+    only set the session they're routed to. Other session factories are untouched.
+    With the route-db-engine option, the engines of _dbs are routed as well, and
+    the engine of _db with the sqlite-db-clone option, into the copy of the test.
+    """
+    router = SessionRouter()
+
+    for session_factory, engine in _dbs.values():
+        router.register(session_factory)
+
+        if pytestconfig._route_db_engine:  # type: ignore
+            router.register_engine(engine)
+
+    if pytestconfig._sqlite_db_clone:  # type: ignore
+        router.register_engine(_db[1])
+
+    try:
+        yield router
+    finally:
+        router.close()
+
+
+def _set_route(request: FixtureRequest, route: Route) -> None:
+    request.addfinalizer(set_route(route))
+
+
+@pytest.fixture(scope="function")
+def _auto_mock_session_by_marker(pytestconfig: Config, request: FixtureRequest) -> None:
+    """
+    Route the application sessions to the transactional session of the test,
+    or to the one of their bind with multiple binds in _dbs. With
+    ``sqlalchemy_db(threads=True)`` the threads of the test get sessions of their
+    own, see ThreadSessions. With the route-db-engine option, the connections
+    of the engines are routed into the transaction of the session, see
+    TestConnection, and the ones of the engine of _db with sqlite-db-clone.
+
+    Requested only by the marked tests, see pytest_collection_modifyitems. The
+    transactional context is opened lazily, on the first call of a session
+    factory.
+    """
+    if not get_db_markers(request.node).sqlalchemy_db:
+        return
+
+    request.getfixturevalue("_session_router")
+    _db = request.getfixturevalue("_db")
+    _dbs = request.getfixturevalue("_dbs")
+    names = _get_bind_names(_db, _dbs)
+    lazy_route = _get_lazy_route(request, names)
+
+    if get_db_markers(request.node).threads:
+        _set_route(request, _get_threads_route(request, names))
+    else:
+        _set_route(request, lazy_route)
+
+    if pytestconfig._route_db_engine or pytestconfig._sqlite_db_clone:  # type: ignore
+        request.addfinalizer(set_engine_route(_get_engine_route(_db, _dbs, lazy_route)))
+
+
+def _get_lazy_route(request: FixtureRequest, names: Dict[sessionmaker, str]) -> Route:
+    def _lazy_session(factory: sessionmaker) -> Session:
+        if factory not in names:
+            return request.getfixturevalue("_session")
+
+        return request.getfixturevalue("_sessions")[names[factory]]
+
+    return _lazy_session
+
+
+def _get_engine_route(
+    _db: DbType, _dbs: Dict[str, DbType], route: Route
+) -> EngineRoute:
+    session_factories = {
+        engine: session_factory for session_factory, engine in _dbs.values()
+    }
+    session_factories.setdefault(_db[1], _db[0])
+
+    def _connection(engine: Engine) -> Connection:
+        session = route(session_factories[engine])
+
+        return typing.cast(Connection, TestConnection(session.connection()))
+
+    return _connection
+
+
+def _get_threads_route(
+    request: FixtureRequest, names: Dict[sessionmaker, str]
+) -> Route:
+    # Opened beforehand, the fixtures can't be set up from the threads
+    session_factory, _ = request.getfixturevalue("_db")
+    timeout = request.config._threads_timeout  # type: ignore
+    threads: Dict[Optional[str], ThreadSessions] = {
+        None: ThreadSessions(
+            session_factory, request.getfixturevalue("_session"), timeout
+        )
+    }
+
+    if names:
+        sessions = request.getfixturevalue("_sessions")
+
+        for factory, name in names.items():
+            threads[name] = ThreadSessions(factory, sessions[name], timeout)
+
+    for thread_sessions in threads.values():
+        request.addfinalizer(thread_sessions.close)
+
+    def _thread_session(factory: sessionmaker) -> Session:
+        return threads[names.get(factory)].get_session()
+
+    return _thread_session
 
 
 @pytest.fixture(scope="function")
 def mock_session(
-    pytestconfig: Config, mocker: MockFixture
+    request: FixtureRequest, _session_router: SessionRouter
 ) -> Callable[[Session], Session]:
+    """
+    Route the session factories of _dbs to the given session until the end
+    of the test, ``mock_session(session)``.
+    """
+
     def _mock_session(session: Session) -> Session:
-        mocker.patch.object(sessionmaker, "__call__", return_value=session)
+        _set_route(request, lambda factory: session)
 
         return session
 
@@ -182,3 +1377,12 @@ def db_session(
     API, just as you might use a SQLAlchemy Session object.
     """
     return _session
+
+
+@pytest.fixture(scope="function")
+def db_sessions(_sessions: Dict[str, Session]) -> Dict[str, Session]:
+    """
+    The sessions of the binds of _dbs by name, the multiple binds counterpart
+    of the db_session fixture. They're all rolled back after the test.
+    """
+    return _sessions
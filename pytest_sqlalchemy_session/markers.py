@@ -0,0 +1,53 @@
+from typing import NamedTuple, Optional
+
+from pytest import Item, Mark, StashKey, UsageError
+
+
+class DbMarkers(NamedTuple):
+    sqlalchemy_db: bool
+    transactional_db: bool
+    # Give the threads of the test sessions of their own, sqlalchemy_db(threads=True)
+    threads: bool
+    # Share a read-only transaction without savepoints, sqlalchemy_db(readonly=True)
+    readonly: bool
+    # The number of the max_queries marker
+    max_queries: Optional[int]
+
+
+db_markers_key = StashKey[DbMarkers]()
+
+
+def get_db_markers(item: Item) -> DbMarkers:
+    """
+    Database markers of the test, looked up once and stored on the item.
+    """
+    markers = item.stash.get(db_markers_key, None)
+
+    if markers is None:
+        sqlalchemy_db = item.get_closest_marker("sqlalchemy_db")
+        max_queries = item.get_closest_marker("max_queries")
+        markers = DbMarkers(
+            sqlalchemy_db=sqlalchemy_db is not None,
+            transactional_db=item.get_closest_marker("transactional_db") is not None,
+            threads=sqlalchemy_db is not None
+            and sqlalchemy_db.kwargs.get("threads", False),
+            readonly=sqlalchemy_db is not None
+            and sqlalchemy_db.kwargs.get("readonly", False),
+            max_queries=_get_max_queries(max_queries),
+        )
+        item.stash[db_markers_key] = markers
+
+    return markers
+
+
+def _get_max_queries(marker: Optional[Mark]) -> Optional[int]:
+    if marker is None:
+        return None
+
+    if len(marker.args) != 1 or not isinstance(marker.args[0], int):
+        raise UsageError(
+            "The max_queries marker requires the maximum number of queries, "
+            "e.g. max_queries(3)."
+        )
+
+    return marker.args[0]
@@ -1,15 +1,67 @@
+import inspect
+import os
+from typing import List, Optional
+
 import pytest
 from _pytest.config import Config
 from _pytest.config.argparsing import Parser
+from pytest import Item, UsageError
 
+from pytest_sqlalchemy_session.baseline import QueryBaseline
 from pytest_sqlalchemy_session.fixtures import (  # noqa
+    EXPIRY_STRATEGIES,
+    _auto_db,
     _auto_mock_session_by_marker,
+    _auto_shared_snapshot,
+    _database_clones,
     _db,
+    _db_app,
+    _db_schema_key,
+    _db_setup,
+    _db_time_recorder,
+    _db_url,
+    _dbs,
+    _dirty_tables,
+    _max_queries_by_marker,
+    _query_baseline,
+    _query_counter,
+    _readonly_transaction,
     _session,
+    _session_router,
+    _sessions,
+    _sessions_pool,
+    _shared_connection,
+    _shared_snapshot,
+    _sql_log,
+    _strict_session_guard,
     _strict_session_rule,
+    _transactional_db_cleanup,
+    assert_max_queries,
+    db_query_counter,
     db_session,
+    db_session_class,
+    db_session_module,
+    db_sessions,
     mock_session,
 )
+from pytest_sqlalchemy_session.markers import get_db_markers
+from pytest_sqlalchemy_session.queries import MaxQueries
+from pytest_sqlalchemy_session.readonly import readonly_transaction_key
+from pytest_sqlalchemy_session.report import DbTimeReport
+from pytest_sqlalchemy_session.sql_log import SqlLog
+
+try:
+    from pytest_sqlalchemy_session.async_fixtures import (  # noqa
+        _async_db,
+        _async_session,
+        _async_session_router,
+        _auto_mock_async_session_by_marker,
+        async_db_session,
+    )
+
+    ASYNC_SESSIONS = True
+except ImportError:  # pytest-asyncio isn't installed, async sessions aren't supported
+    ASYNC_SESSIONS = False
 
 
 @pytest.hookimpl
@@ -20,15 +72,299 @@ def pytest_addoption(parser: Parser) -> None:
         help="Enable strict DB mode. Should use marker sqlalchemy_db in all tests that use DB session.",
         default=False,
     )
+    parser.addini(
+        "reuse-db-connection",
+        type="bool",
+        help="Hold one connection with an outer transaction for the whole session "
+        "and isolate each test with a savepoint on it.",
+        default=False,
+    )
+    parser.addini(
+        "route-db-engine",
+        type="bool",
+        help="Route engine.connect() and engine.begin() of the application into "
+        "the transaction of the tests marked sqlalchemy_db.",
+        default=False,
+    )
+    parser.addini(
+        "db-savepoint-expiry",
+        help="What is expired when the code under test ends the savepoint of "
+        "the test session: all (default), none to follow expire_on_commit of the "
+        "session, or dirty-only for the objects written in it. SQLAlchemy 1.4 only.",
+        default="all",
+    )
+    parser.addini(
+        "db-threads-timeout",
+        help="How many seconds the threads of a test marked "
+        "sqlalchemy_db(threads=True) wait for the connection held by another one.",
+        default="30",
+    )
+    parser.addini(
+        "sqlite-db-clone",
+        type="bool",
+        help="Give each test a copy of the SQLite database of _db, made with "
+        "the backup API, instead of a transaction rolled back at its end.",
+        default=False,
+    )
+    parser.addini(
+        "shared-db-snapshot",
+        type="bool",
+        help="Share one database seeded once between the pytest-xdist workers, "
+        "the tests begin from a snapshot of it exported by their worker. "
+        "PostgreSQL only.",
+        default=False,
+    )
+    parser.addini(
+        "transactional-db-cleanup",
+        type="bool",
+        help="Clean up the tables written to by the tests marked transactional_db "
+        "after each of them.",
+        default=False,
+    )
+    parser.addini(
+        "db-time-report",
+        type="bool",
+        help="Report the database time of the tests at the end of the session.",
+        default=False,
+    )
+    parser.addini(
+        "db-time-report-json",
+        help="Write the database time of the tests to this JSON file.",
+        default=None,
+    )
+    parser.addini(
+        "db-query-baseline",
+        help="Compare the queries of the tests with the ones stored in this file.",
+        default=None,
+    )
+    parser.addini(
+        "db-query-baseline-tolerance",
+        help="The number of queries a test can execute above its baseline.",
+        default="0",
+    )
+    parser.addini(
+        "db-query-baseline-warn",
+        type="bool",
+        help="Warn instead of failing the tests executing more queries than "
+        "in the query baseline.",
+        default=False,
+    )
+    parser.addini(
+        "db-sql-log",
+        help="Keep the last N statements of each test and show them when it fails.",
+        default="0",
+    )
+    parser.addoption(
+        "--db-time-report",
+        action="store_true",
+        default=False,
+        help="Report the database time of the tests at the end of the session.",
+    )
+    parser.addoption(
+        "--db-time-report-json",
+        default=None,
+        metavar="PATH",
+        help="Write the database time of the tests to a JSON file.",
+    )
+    parser.addoption(
+        "--db-query-baseline",
+        default=None,
+        metavar="PATH",
+        help="Compare the queries of the tests with the ones stored in a file, "
+        "e.g. committed to the repository or in .pytest_cache.",
+    )
+    parser.addoption(
+        "--db-query-baseline-update",
+        action="store_true",
+        default=False,
+        help="Store the queries of the tests that passed in the query baseline "
+        "instead of comparing them.",
+    )
+    parser.addoption(
+        "--db-sql-log",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Keep the last N statements of each test and show them when it fails.",
+    )
+    parser.addoption(
+        "--reuse-db",
+        action="store_true",
+        default=False,
+        help="Keep the database created from _db_url between runs, and rebuild it "
+        "only when the fingerprint of the schema from _db_schema_key, required "
+        "with the option, changes.",
+    )
 
 
 @pytest.hookimpl(trylast=True)
 def pytest_configure(config: Config) -> None:
     config._enable_strict = config.getini("strict-db")  # type: ignore
+    config._reuse_connection = config.getini("reuse-db-connection")  # type: ignore
+    config._reuse_db = config.getoption("reuse_db")  # type: ignore
+    config._route_db_engine = config.getini("route-db-engine")  # type: ignore
+    config._savepoint_expiry = _get_savepoint_expiry(config)  # type: ignore
+    config._threads_timeout = float(config.getini("db-threads-timeout"))  # type: ignore
+    config._shared_db_snapshot = _get_shared_db_snapshot(config)  # type: ignore
+    config._sqlite_db_clone = config.getini("sqlite-db-clone")  # type: ignore
+    config._transactional_db_cleanup = config.getini(  # type: ignore
+        "transactional-db-cleanup"
+    )
+
+    config._db_time_report = _register_db_time_report(config)  # type: ignore
+    config._query_baseline = _register_query_baseline(config)  # type: ignore
+    config._sql_log = _register_sql_log(config)  # type: ignore
 
     config.addinivalue_line(
-        "markers", "sqlalchemy_db: mark test to use isolated transactions"
+        "markers",
+        "sqlalchemy_db(threads=False, readonly=False): mark test to use isolated "
+        "transactions, with threads=True each thread gets a session of its own, "
+        "with readonly=True the test shares a read-only transaction",
     )
     config.addinivalue_line(
         "markers", "transactional_db: mark test to use usual transactions"
     )
+    config.addinivalue_line(
+        "markers", "max_queries(number): fail the test if it executes more queries"
+    )
+
+
+def _get_savepoint_expiry(config: Config) -> str:
+    expiry = config.getini("db-savepoint-expiry")
+
+    if expiry not in EXPIRY_STRATEGIES:
+        raise UsageError(
+            f"db-savepoint-expiry must be one of {', '.join(EXPIRY_STRATEGIES)}, "
+            f"not {expiry!r}."
+        )
+
+    return expiry
+
+
+def _get_shared_db_snapshot(config: Config) -> bool:
+    shared_db_snapshot = config.getini("shared-db-snapshot")
+
+    # The cleanup would truncate the shared database, seed included
+    if shared_db_snapshot and config.getini("transactional-db-cleanup"):
+        raise UsageError(
+            "shared-db-snapshot can't be used with transactional-db-cleanup, "
+            "the tables of the shared database would be cleaned up for all the workers."
+        )
+
+    return shared_db_snapshot
+
+
+def _register_db_time_report(config: Config) -> Optional[DbTimeReport]:
+    json_path = (
+        config.getoption("db_time_report_json")
+        or config.getini("db-time-report-json")
+        or None
+    )
+
+    if not (
+        config.getoption("db_time_report")
+        or config.getini("db-time-report")
+        or json_path
+    ):
+        return None
+
+    report = DbTimeReport(config, json_path)
+    config.pluginmanager.register(report, "sqlalchemy_session_db_time_report")
+
+    return report
+
+
+def _register_query_baseline(config: Config) -> Optional[QueryBaseline]:
+    path = (
+        config.getoption("db_query_baseline")
+        or config.getini("db-query-baseline")
+        or None
+    )
+
+    if path is None:
+        return None
+
+    baseline = QueryBaseline(
+        config,
+        os.path.join(config.rootpath, path),
+        update=config.getoption("db_query_baseline_update"),
+        tolerance=int(config.getini("db-query-baseline-tolerance")),
+        warn=config.getini("db-query-baseline-warn"),
+    )
+    config.pluginmanager.register(baseline, "sqlalchemy_session_query_baseline")
+
+    return baseline
+
+
+def _register_sql_log(config: Config) -> Optional[SqlLog]:
+    size = config.getoption("db_sql_log")
+
+    if size is None:
+        size = int(config.getini("db-sql-log"))
+
+    if not size:
+        return None
+
+    sql_log = SqlLog(size)
+    config.pluginmanager.register(sql_log, "sqlalchemy_session_sql_log")
+
+    return sql_log
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config: Config, items: List[Item]) -> None:
+    # Look the markers up once, and add the fixtures of the markers and options
+    # to the tests that need them instead of autouse fixtures set up for all
+    for item in items:
+        _use_marker_fixtures(config, item)
+
+
+def _use_marker_fixtures(config: Config, item: Item) -> None:
+    markers = get_db_markers(item)
+
+    if markers.sqlalchemy_db:
+        _use_session_routes(item)
+
+    if config._enable_strict and not (  # type: ignore
+        markers.sqlalchemy_db or markers.transactional_db
+    ):
+        _use_fixture(item, "_strict_session_rule")
+
+    if config._transactional_db_cleanup and markers.transactional_db:  # type: ignore
+        _use_fixture(item, "_transactional_db_cleanup")
+
+    if markers.max_queries is not None:
+        _use_fixture(item, "_max_queries_by_marker")
+        _register_max_queries(config)
+
+
+def _use_fixture(item: Item, name: str) -> None:
+    # Set up first like an autouse fixture, but only for the tests that need it.
+    # The parametrized tests of a function share their fixture names, so the
+    # fixture checks the markers of its test again
+    if isinstance(item, pytest.Function) and name not in item.fixturenames:
+        item.fixturenames.insert(0, name)
+
+
+def _use_session_routes(item: Item) -> None:
+    if ASYNC_SESSIONS and inspect.iscoroutinefunction(getattr(item, "function", None)):
+        _use_fixture(item, "_auto_mock_async_session_by_marker")
+
+    _use_fixture(item, "_auto_mock_session_by_marker")
+
+
+def _register_max_queries(config: Config) -> None:
+    if not config.pluginmanager.has_plugin("sqlalchemy_session_max_queries"):
+        config.pluginmanager.register(MaxQueries(), "sqlalchemy_session_max_queries")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item: Item, nextitem: Optional[Item]) -> None:
+    # The read-only transaction is kept open only for a read-only test
+    readonly_transaction = item.config.stash.get(readonly_transaction_key, None)
+
+    if readonly_transaction is None:
+        return
+
+    if nextitem is None or not get_db_markers(nextitem).readonly:
+        readonly_transaction.close()
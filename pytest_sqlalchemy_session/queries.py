@@ -0,0 +1,128 @@
+import collections
+import contextlib
+import re
+import typing
+from typing import Generator, List, Optional
+
+import pluggy
+import pytest
+from pytest import Item, StashKey
+from sqlalchemy.engine import Connection
+
+from pytest_sqlalchemy_session.markers import get_db_markers
+
+# SAVEPOINT housekeeping of the transactional context isn't a query of the test
+HOUSEKEEPING_RE = re.compile(
+    r"^\s*(?:SAVEPOINT|RELEASE\s+SAVEPOINT|ROLLBACK\s+TO\s+SAVEPOINT)\b",
+    re.IGNORECASE,
+)
+
+FINGERPRINT_REPLACEMENTS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s"), "?"),
+    (re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE), "IN (...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+class QueryCounter:
+    """
+    Records the statements executed on the engine while a test counts them.
+    """
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.active = False
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def start(self) -> None:
+        self.statements = []
+        self.active = True
+
+    def stop(self) -> None:
+        self.active = False
+
+    def __call__(
+        self,
+        conn: Connection,
+        cursor: typing.Any,
+        statement: str,
+        *args: typing.Any,
+    ) -> None:
+        if self.active and not HOUSEKEEPING_RE.match(statement):
+            self.statements.append(statement)
+
+    @contextlib.contextmanager
+    def assert_max_queries(self, number: int) -> Generator[None, None, None]:
+        """Fail if the block executes more than ``number`` queries."""
+        start = len(self.statements)
+
+        yield
+
+        check_max_queries(self.statements[start:], number)
+
+
+class MaxQueries:
+    """
+    Checks the queries of the test call against the max_queries marker, once
+    the counter of the test is set up by _max_queries_by_marker. Registered only
+    when a collected test has the marker.
+    """
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(
+        self, item: Item
+    ) -> Generator[None, pluggy.Result[None], None]:
+        # Only the queries of the test call, the counter starts in the fixtures setup
+        query_counter = item.stash.get(query_counter_key, None)
+        start = query_counter.count if query_counter is not None else 0
+
+        outcome: pluggy.Result[None] = yield
+
+        if query_counter is None or outcome.excinfo is not None:
+            return
+
+        try:
+            check_max_queries(
+                query_counter.statements[start:],
+                typing.cast(int, get_db_markers(item).max_queries),
+            )
+        except AssertionError as error:
+            outcome.force_exception(error)
+
+
+def check_max_queries(statements: List[str], number: int) -> None:
+    if len(statements) <= number:
+        return
+
+    raise AssertionError(
+        f"Expected at most {number} queries, {len(statements)} were executed:\n"
+        + format_statements(statements)
+    )
+
+
+def get_fingerprint(statement: str) -> str:
+    """The statement with literals and parameters replaced, to group repeated ones."""
+    for pattern, replacement in FINGERPRINT_REPLACEMENTS:
+        statement = pattern.sub(replacement, statement)
+
+    return statement.strip()
+
+
+def format_statements(statements: List[str]) -> str:
+    """The statements grouped by fingerprint, the most repeated first."""
+    counter = collections.Counter(
+        get_fingerprint(statement) for statement in statements
+    )
+
+    return "\n".join(
+        f"{count:>6} x {fingerprint}" for fingerprint, count in counter.most_common()
+    )
+
+
+# The query counter of a test marked max_queries
+query_counter_key = StashKey[Optional[QueryCounter]]()
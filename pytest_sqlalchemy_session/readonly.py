@@ -0,0 +1,131 @@
+import contextlib
+import typing
+from typing import Generator, Optional
+
+from pytest import StashKey, UsageError
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from pytest_sqlalchemy_session.cleanup import WRITE_STATEMENT_RE
+from pytest_sqlalchemy_session.routing import connect
+from pytest_sqlalchemy_session.snapshot import SharedSnapshot
+from pytest_sqlalchemy_session.sqlite import enable_savepoints
+
+READ_ONLY_DIALECTS = ("postgresql", "sqlite")
+
+
+class ReadOnlyTransaction:
+    """
+    A read-only transaction shared by consecutive tests marked
+    ``sqlalchemy_db(readonly=True)``, instead of a root transaction and
+    savepoints for each of them.
+
+    Writes fail right away: the transactions are READ ONLY on PostgreSQL, and
+    the connection is query_only on SQLite. The connection is opened on first
+    use, and closed before a test that isn't read-only, see
+    ``pytest_runtest_teardown``, or after a failed statement, which leaves the
+    transaction of PostgreSQL aborted.
+    """
+
+    def __init__(self, engine: Engine, snapshot: Optional[SharedSnapshot] = None):
+        self.engine = engine
+        self.snapshot = snapshot
+        self.connection: Optional[Connection] = None
+        self._failed = False
+
+    def begin(self) -> Connection:
+        """The connection in the read-only transaction, opened if needed."""
+        if self._failed:
+            self.close()
+
+        if self.connection is None:
+            self.connection = self._connect()
+
+        if not self.connection.in_transaction():
+            # Ended by a rollback of the test, a new one is read-only as well
+            self.connection.begin()
+
+        return self.connection
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+
+        event.remove(self.engine, "handle_error", self._handle_error)
+
+        if self.engine.dialect.name == "sqlite":
+            _execute(self.connection, "PRAGMA query_only = OFF")
+
+        # Rollback the transaction and return the connection to the pool
+        self.connection.close()
+        self.connection = None
+        self._failed = False
+
+    def _connect(self) -> Connection:
+        if self.engine.dialect.name not in READ_ONLY_DIALECTS:
+            raise UsageError(
+                "sqlalchemy_db(readonly=True) requires PostgreSQL or SQLite, "
+                f"not {self.engine.dialect.name}."
+            )
+
+        enable_savepoints(self.engine)
+        connection = connect(self.engine)
+
+        if self.engine.dialect.name == "sqlite":
+            _execute(connection, "PRAGMA query_only = ON")
+        else:
+            event.listen(connection, "begin", _set_transaction_read_only)
+
+        if self.snapshot is not None:
+            self.snapshot.install(connection)
+
+        event.listen(self.engine, "handle_error", self._handle_error)
+
+        return connection
+
+    def _handle_error(self, context: typing.Any) -> None:
+        if context.connection is not None and context.connection is self.connection:
+            self._failed = True
+
+
+@contextlib.contextmanager
+def reject_writes(engine: Engine) -> Generator[None, None, None]:
+    """
+    Reject the INSERT, UPDATE and DELETE statements of a test marked
+    ``sqlalchemy_db(readonly=True)`` that runs in a savepoint of the shared
+    connection, with reuse-db-connection or in a module or class scope: that
+    transaction is shared with the writing tests, it can't be made read-only.
+    """
+    event.listen(engine, "before_cursor_execute", _reject_write)
+
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", _reject_write)
+
+
+def _reject_write(
+    connection: Connection, cursor: typing.Any, statement: str, *args: typing.Any
+) -> None:
+    if WRITE_STATEMENT_RE.match(statement):
+        raise UsageError(
+            "A test marked sqlalchemy_db(readonly=True) can't write to the database: "
+            f"{statement}"
+        )
+
+
+def _set_transaction_read_only(connection: Connection) -> None:
+    _execute(connection, "SET TRANSACTION READ ONLY")
+
+
+def _execute(connection: Connection, statement: str) -> None:
+    # Use the DBAPI cursor, so the housekeeping isn't visible to engine events
+    cursor = connection.connection.cursor()
+
+    try:
+        cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+readonly_transaction_key = StashKey[ReadOnlyTransaction]()
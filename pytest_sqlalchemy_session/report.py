@@ -0,0 +1,197 @@
+import contextlib
+import json
+import time
+import typing
+import weakref
+from typing import Dict, Generator, List, Optional, TypeVar
+
+import pluggy
+import pytest
+from pytest import Config, Item, TestReport
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+T = TypeVar("T")
+
+STARTED_AT_KEY = "pytest_sqlalchemy_session_started_at"
+
+SLOWEST_TESTS = 10
+
+
+class TestDbTime:
+    """The database time of a test."""
+
+    __slots__ = ("db_time", "statements", "rows", "fixture_time")
+
+    def __init__(
+        self,
+        db_time: float = 0.0,
+        statements: int = 0,
+        rows: int = 0,
+        fixture_time: float = 0.0,
+    ):
+        self.db_time = db_time
+        self.statements = statements
+        self.rows = rows
+        self.fixture_time = fixture_time
+
+    def add(self, other: "TestDbTime") -> None:
+        self.db_time += other.db_time
+        self.statements += other.statements
+        self.rows += other.rows
+        self.fixture_time += other.fixture_time
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class DbTimeRecorder:
+    """
+    Records the time spent in ``cursor.execute`` by the current test, with
+    a single pair of listeners on each engine.
+    """
+
+    def __init__(self) -> None:
+        self.current: Optional[TestDbTime] = None
+        self.engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+    def install(self, engine: Engine) -> None:
+        if engine in self.engines:
+            return
+
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+        self.engines.add(engine)
+
+    def before_cursor_execute(
+        self, conn: Connection, cursor: typing.Any, *args: typing.Any
+    ) -> None:
+        conn.info[STARTED_AT_KEY] = time.perf_counter()
+
+    def after_cursor_execute(
+        self, conn: Connection, cursor: typing.Any, *args: typing.Any
+    ) -> None:
+        started_at = conn.info.pop(STARTED_AT_KEY, None)
+
+        if self.current is None or started_at is None:
+            return
+
+        self.current.db_time += time.perf_counter() - started_at
+        self.current.statements += 1
+        # Rows returned or affected, as reported by the cursor
+        self.current.rows += max(cursor.rowcount, 0)
+
+    @contextlib.contextmanager
+    def measure_fixture(
+        self, context: typing.ContextManager[T]
+    ) -> Generator[T, None, None]:
+        """Enter and exit the context, recording the time as the fixture time."""
+        started_at = time.perf_counter()
+
+        with context as value:
+            self.add_fixture_time(time.perf_counter() - started_at)
+
+            yield value
+
+            started_at = time.perf_counter()
+
+        self.add_fixture_time(time.perf_counter() - started_at)
+
+    def add_fixture_time(self, duration: float) -> None:
+        if self.current is not None:
+            self.current.fixture_time += duration
+
+
+class DbTimeReport:
+    """
+    Collects the database time of the tests, from the workers as well
+    with pytest-xdist, and reports it at the end of the session.
+    """
+
+    def __init__(self, config: Config, json_path: Optional[str]):
+        self.config = config
+        self.json_path = json_path
+        self.recorder = DbTimeRecorder()
+        self.tests: Dict[str, TestDbTime] = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: Item) -> Generator[None, None, None]:
+        self.recorder.current = TestDbTime()
+
+        yield
+
+        self.recorder.current = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(
+        self, item: Item
+    ) -> Generator[None, pluggy.Result[TestReport], None]:
+        outcome: pluggy.Result[TestReport] = yield
+        report: TestReport = outcome.get_result()
+
+        if report.when == "teardown" and self.recorder.current is not None:
+            # Sent to the controller with the report by pytest-xdist workers
+            report.db_time = self.recorder.current.as_dict()  # type: ignore
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        db_time = getattr(report, "db_time", None)
+
+        if report.when == "teardown" and db_time is not None:
+            self.tests[report.nodeid] = TestDbTime(**db_time)
+
+    def pytest_terminal_summary(self, terminalreporter: typing.Any) -> None:
+        if not self.tests:
+            return
+
+        totals = self.get_totals()
+        terminalreporter.write_sep("=", "slowest DB tests")
+        terminalreporter.write_line(
+            f"{'db time':>10} {'statements':>10} {'rows':>8} {'fixtures':>10}  test"
+        )
+
+        for nodeid, test in self.get_slowest():
+            terminalreporter.write_line(_format_row(test, nodeid))
+
+        terminalreporter.write_line(_format_row(totals, f"total of {len(self.tests)}"))
+
+    def pytest_sessionfinish(self) -> None:
+        if self.json_path is None or hasattr(self.config, "workerinput"):
+            return
+
+        with open(self.json_path, "w") as output:
+            json.dump(
+                {
+                    "totals": self.get_totals().as_dict(),
+                    "tests": {
+                        nodeid: test.as_dict() for nodeid, test in self.tests.items()
+                    },
+                },
+                output,
+                indent=2,
+            )
+
+    def get_totals(self) -> TestDbTime:
+        totals = TestDbTime()
+
+        for test in self.tests.values():
+            totals.add(test)
+
+        return totals
+
+    def get_slowest(self) -> List[typing.Tuple[str, TestDbTime]]:
+        tests = sorted(
+            self.tests.items(),
+            key=lambda item: item[1].db_time + item[1].fixture_time,
+            reverse=True,
+        )
+
+        return [
+            (nodeid, test) for nodeid, test in tests[:SLOWEST_TESTS] if test.statements
+        ]
+
+
+def _format_row(test: TestDbTime, name: str) -> str:
+    return (
+        f"{test.db_time:>9.3f}s {test.statements:>10} {test.rows:>8} "
+        f"{test.fixture_time:>9.3f}s  {name}"
+    )
@@ -0,0 +1,198 @@
+import contextlib
+import functools
+import typing
+from contextvars import ContextVar
+from typing import Callable, Dict, Generator, Generic, List, Optional, Type, TypeVar
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+T = TypeVar("T")
+
+# Returns the session of the current test for a routed session factory
+Route = Callable[[sessionmaker], Session]
+# Returns a connection in the transaction of the current test for a routed engine
+EngineRoute = Callable[[Engine], Connection]
+
+
+class RouteVar(Generic[T]):
+    """
+    The route of the current context, and of the running test for the threads
+    it starts: a new thread begins with an empty context.
+    """
+
+    def __init__(self, name: str):
+        self.var: ContextVar[Optional[T]] = ContextVar(name, default=None)
+        self.threads_route: Optional[T] = None
+
+    def get(self) -> Optional[T]:
+        return self.var.get() or self.threads_route
+
+    def set(self, route: T) -> Callable[[], None]:
+        """Set the route, return the function resetting it."""
+        token = self.var.set(route)
+        previous_threads_route, self.threads_route = self.threads_route, route
+
+        def reset() -> None:
+            self.var.reset(token)
+            self.threads_route = previous_threads_route
+
+        return reset
+
+
+# Set while a test routes the sessions and the connections of the application
+session_route: RouteVar[Route] = RouteVar("session_route")
+engine_route: RouteVar[EngineRoute] = RouteVar("engine_route")
+
+
+def set_route(route: Route) -> Callable[[], None]:
+    """
+    Route the registered session factories to ``route`` in the current context
+    and in the threads started meanwhile, return the function resetting it.
+    """
+    return session_route.set(route)
+
+
+def set_engine_route(route: EngineRoute) -> Callable[[], None]:
+    """The same as ``set_route`` for the registered engines."""
+    return engine_route.set(route)
+
+
+class SessionRouter:
+    """
+    Redirects the calls of the registered session factories of the application
+    to the session of the current test, other session factories are untouched.
+    Registered engines are redirected the same way: ``connect()`` and ``begin()``
+    return connections in the transaction of the test.
+
+    They're routed once for the whole session: the factories are switched to
+    a subclass of their class, or their class gets a routed ``__call__`` when it
+    can't be switched, and the engines get routed methods of their own.
+    The tests only set the route with ``set_route`` and ``set_engine_route``.
+    """
+
+    def __init__(self) -> None:
+        self.factories: Dict[sessionmaker, Type[sessionmaker]] = {}
+        self.engines: List[Engine] = []
+        # The patched classes of the factories, with their own __call__ if any
+        self.factory_classes: Dict[type, Optional[Callable[..., typing.Any]]] = {}
+
+    def register(self, factory: sessionmaker) -> None:
+        if factory in self.factories:
+            return
+
+        self.factories[factory] = type(factory)
+
+        try:
+            factory.__class__ = _get_routed_class(type(factory))
+        except TypeError:
+            # The layout of async_sessionmaker of SQLAlchemy 2.0 differs from the
+            # one of its subclasses, its __call__ is routed for the registered ones
+            self._patch_factory_class(type(factory))
+
+    def _patch_factory_class(self, factory_class: type) -> None:
+        if factory_class in self.factory_classes:
+            return
+
+        self.factory_classes[factory_class] = vars(factory_class).get("__call__")
+        factory_call = factory_class.__call__
+        factories = self.factories
+
+        def __call__(factory: typing.Any, **local_kw: typing.Any) -> typing.Any:
+            route = session_route.get()
+
+            if route is None or factory not in factories:
+                return factory_call(factory, **local_kw)
+
+            return route(factory)
+
+        setattr(factory_class, "__call__", __call__)
+
+    def register_engine(self, engine: Engine) -> None:
+        # Unlike the factories, the class of an engine of SQLAlchemy 2.0 can't be
+        # switched, the methods are overridden on the instance
+        if engine in self.engines:
+            return
+
+        self.engines.append(engine)
+        engine.connect = functools.partial(_connect, engine)  # type: ignore
+        engine.begin = functools.partial(_begin, engine)  # type: ignore
+
+    def close(self) -> None:
+        for factory, factory_class in self.factories.items():
+            if factory_class not in self.factory_classes:
+                factory.__class__ = factory_class
+
+        for factory_class, factory_call in self.factory_classes.items():
+            _restore_call(factory_class, factory_call)
+
+        for engine in self.engines:
+            del engine.connect
+            del engine.begin
+
+        self.factories.clear()
+        self.engines.clear()
+        self.factory_classes.clear()
+
+
+def _restore_call(
+    factory_class: type, factory_call: Optional[Callable[..., typing.Any]]
+) -> None:
+    if factory_call is None:
+        delattr(factory_class, "__call__")
+    else:
+        setattr(factory_class, "__call__", factory_call)
+
+
+class _RoutedSessionmaker:
+    def __call__(self, **local_kw: typing.Any) -> Session:
+        route = session_route.get()
+
+        if route is None:
+            return super().__call__(**local_kw)  # type: ignore
+
+        return route(typing.cast(sessionmaker, self))
+
+
+def _connect(engine: Engine, *args: typing.Any, **kwargs: typing.Any) -> Connection:
+    route = engine_route.get()
+
+    if route is None:
+        return connect(engine, *args, **kwargs)
+
+    return route(engine)
+
+
+def _begin(engine: Engine, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+    route = engine_route.get()
+
+    if route is None:
+        return type(engine).begin(engine, *args, **kwargs)
+
+    return _begin_connection(route(engine))
+
+
+@contextlib.contextmanager
+def _begin_connection(connection: Connection) -> Generator[Connection, None, None]:
+    with connection:
+        with connection.begin():
+            yield connection
+
+
+def connect(engine: Engine, *args: typing.Any, **kwargs: typing.Any) -> Connection:
+    """A connection of the engine itself, even if the engine is routed."""
+    return type(engine).connect(engine, *args, **kwargs)
+
+
+_routed_classes: Dict[Type[sessionmaker], Type[sessionmaker]] = {}
+
+
+def _get_routed_class(factory_class: Type[sessionmaker]) -> Type[sessionmaker]:
+    if factory_class not in _routed_classes:
+        _routed_classes[factory_class] = type(
+            f"Routed{factory_class.__name__}",
+            (_RoutedSessionmaker, factory_class),
+            {},
+        )
+
+    return _routed_classes[factory_class]
@@ -1,5 +1,7 @@
 import logging
+from typing import Callable, Optional
 
+from sqlalchemy import event
 from sqlalchemy import exc as sa_exc
 from sqlalchemy.orm import Session, SessionTransaction
 
@@ -7,6 +9,9 @@ logger = logging.getLogger(__name__)
 
 
 class TestSession(Session):
+    # Called each time a transaction of the session ends, see RestartSavepoint
+    restart_savepoint: Optional[Callable[[Session, SessionTransaction], None]] = None
+
     def begin(
         self,
         subtransactions: bool = False,
@@ -34,3 +39,24 @@ class TestSession(Session):
         transaction.fake_nested = fake_nested
 
         return transaction
+
+    def commit(self) -> None:
+        # End the innermost transaction in 2.0 style (future=True, always on for
+        # the sync session of an AsyncSession) as well: the outermost transaction
+        # of the code under test is the main nested one
+        if self._transaction is None and not self._autobegin():
+            raise sa_exc.InvalidRequestError("No transaction is begun.")
+
+        self._transaction.commit()
+
+    def rollback(self) -> None:
+        if self._transaction is not None:
+            self._transaction.rollback()
+
+
+@event.listens_for(TestSession, "after_transaction_end")
+def _restart_savepoint(session: TestSession, transaction: SessionTransaction) -> None:
+    # A single listener for all test sessions: adding and removing a listener
+    # per session mutates the event registry on every test
+    if session.restart_savepoint is not None:
+        session.restart_savepoint(session, transaction)
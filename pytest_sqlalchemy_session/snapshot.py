@@ -0,0 +1,67 @@
+from typing import Optional
+
+from pytest import UsageError
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+
+from pytest_sqlalchemy_session.routing import connect
+
+
+class SharedSnapshot:
+    """
+    The snapshot of the seeded database the transactions of the tests begin from,
+    exported by a REPEATABLE READ transaction held open for the whole session.
+
+    The pytest-xdist workers share one database with the shared-db-snapshot
+    option, so what the tests marked transactional_db commit in a worker could
+    show up in the tests of the others: from the snapshot, the tests see the
+    database as it was seeded, and their own changes. It's exported as soon as
+    the worker joins the database, before any of its tests runs.
+    """
+
+    def __init__(self, engine: Engine):
+        if engine.dialect.name != "postgresql":
+            raise UsageError("The shared-db-snapshot option requires PostgreSQL.")
+
+        self.engine = engine
+        self.connection: Optional[Connection] = None
+        self.snapshot_id: Optional[str] = None
+
+    def export(self) -> None:
+        if self.snapshot_id is not None:
+            return
+
+        self.connection = connect(self.engine).execution_options(
+            isolation_level="REPEATABLE READ"
+        )
+        self.connection.begin()
+        self.snapshot_id = self.connection.execute(
+            text("SELECT pg_export_snapshot()")
+        ).scalar()
+
+    def install(self, connection: Connection) -> None:
+        """Begin the transactions of the connection from the snapshot."""
+        if self.snapshot_id is None:
+            raise UsageError("The shared snapshot must be exported before use.")
+
+        event.listen(connection, "begin", self._set_snapshot)
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+
+        self.connection.close()
+        self.connection = None
+        self.snapshot_id = None
+
+    def _set_snapshot(self, connection: Connection) -> None:
+        # Use the DBAPI cursor, so the housekeeping isn't visible to engine events
+        cursor = connection.connection.cursor()
+
+        try:
+            cursor.execute(
+                "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ; "
+                f"SET TRANSACTION SNAPSHOT '{self.snapshot_id}'"
+            )
+        finally:
+            cursor.close()
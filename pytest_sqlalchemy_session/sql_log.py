@@ -0,0 +1,82 @@
+import collections
+import typing
+import weakref
+from typing import Generator, Optional
+
+import pluggy
+import pytest
+from pytest import Item, TestReport
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+# A statement as executed: the statement, its parameters, executemany
+LoggedStatement = typing.Tuple[str, typing.Any, bool]
+
+
+class SqlLog:
+    """
+    Keeps the last statements of the current test in a bounded buffer, with
+    a single listener on each engine, and adds them to the report of the
+    test only when it fails.
+    """
+
+    def __init__(self, size: int):
+        self.statements: "typing.Deque[LoggedStatement]" = collections.deque(
+            maxlen=size
+        )
+        self.engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+        # The buffer is added to the first failed report of a test only
+        self.reported: Optional[str] = None
+
+    def install(self, engine: Engine) -> None:
+        if engine in self.engines:
+            return
+
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        self.engines.add(engine)
+
+    def before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: typing.Any,
+        statement: str,
+        parameters: typing.Any,
+        context: typing.Any,
+        executemany: bool,
+    ) -> None:
+        # The parameters are only formatted when a test fails
+        self.statements.append((statement, parameters, executemany))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: Item) -> Generator[None, None, None]:
+        self.statements.clear()
+        self.reported = None
+
+        yield
+
+        self.statements.clear()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(
+        self, item: Item
+    ) -> Generator[None, pluggy.Result[TestReport], None]:
+        outcome: pluggy.Result[TestReport] = yield
+        report: TestReport = outcome.get_result()
+
+        if not report.failed or self.reported is not None or not self.statements:
+            return
+
+        self.reported = report.when
+        report.sections.append((f"Captured SQL {report.when}", self.format()))
+
+    def format(self) -> str:
+        maxlen = typing.cast(int, self.statements.maxlen)
+        lines = [f"The last {len(self.statements)} statements, at most {maxlen}:"]
+
+        for statement, parameters, executemany in self.statements:
+            lines.append(statement.strip())
+            lines.append(
+                f"  {'executemany' if executemany else 'parameters'}: {parameters!r}"
+            )
+
+        return "\n".join(lines)
@@ -0,0 +1,132 @@
+import sqlite3
+import typing
+import weakref
+from typing import Union
+
+from pytest import UsageError
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.pool import StaticPool
+
+# Engines whose connections have the SAVEPOINT workaround of pysqlite
+_savepoint_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+def is_memory_url(url: Union[str, URL]) -> bool:
+    """Whether the URL is of an in-memory SQLite database."""
+    url = make_url(url)
+
+    if url.get_backend_name() != "sqlite":
+        return False
+
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def is_pysqlite(engine: Engine) -> bool:
+    return engine.dialect.name == "sqlite" and engine.dialect.driver == "pysqlite"
+
+
+def create_sqlite_engine(url: Union[str, URL]) -> Engine:
+    """
+    An engine of the SQLite database with working savepoints. An in-memory
+    database lives as long as its connection: the engine keeps a single one
+    shared by the threads of the tests.
+    """
+    if is_memory_url(url):
+        engine = create_engine(
+            url,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+    else:
+        engine = create_engine(url)
+
+    enable_savepoints(engine)
+
+    return engine
+
+
+def enable_savepoints(engine: Engine) -> None:
+    """
+    Apply the workaround of the SQLAlchemy documentation for pysqlite, which
+    begins transactions on its own and breaks SAVEPOINT: the driver is switched
+    to autocommit and SQLAlchemy emits BEGIN itself. Other engines are untouched.
+    """
+    if not is_pysqlite(engine) or engine in _savepoint_engines:
+        return
+
+    event.listen(engine, "connect", _disable_implicit_begin)
+    event.listen(engine, "begin", _begin)
+    _savepoint_engines.add(engine)
+
+
+def _disable_implicit_begin(
+    dbapi_connection: typing.Any, connection_record: typing.Any
+) -> None:
+    dbapi_connection.isolation_level = None
+
+
+def _begin(connection: Connection) -> None:
+    # The connections opened before the workaround, e.g. the one of a StaticPool
+    dbapi_connection = connection.connection.dbapi_connection
+
+    if dbapi_connection.isolation_level is not None:
+        dbapi_connection.isolation_level = None
+
+    # Through the DBAPI cursor like the other housekeeping, so that the query
+    # counter and the other listeners of the statements don't see it
+    cursor = dbapi_connection.cursor()
+
+    try:
+        cursor.execute("BEGIN")
+    finally:
+        cursor.close()
+
+
+class DatabaseClones:
+    """
+    In-memory copies of a SQLite database, the golden one: before each test
+    the golden database is copied over the one of the tests with the backup API
+    of sqlite3, so the commits and DDL of a test are gone for the next one.
+
+    The copies are made into a single connection of an engine kept for the whole
+    session: the copy itself costs less than a new connection of SQLAlchemy.
+    """
+
+    def __init__(self, golden_engine: Engine):
+        if not is_pysqlite(golden_engine):
+            raise UsageError(
+                "The sqlite-db-clone option requires a SQLite database of pysqlite."
+            )
+
+        # Checked out for the whole session, an in-memory database has a single one
+        self.golden = golden_engine.raw_connection()
+        self.connection = sqlite3.connect(":memory:", check_same_thread=False)
+        self.engine = create_engine(
+            "sqlite://", creator=lambda: self.connection, poolclass=StaticPool
+        )
+        enable_savepoints(self.engine)
+
+    def clone(self) -> Engine:
+        """Copy the golden database, return the engine of the copy."""
+        golden = self.golden.dbapi_connection
+
+        if golden.in_transaction:
+            # The backup would wait for the end of the transaction forever
+            raise UsageError(
+                "The SQLite database can't be copied in a transaction, "
+                "e.g. of db_session_module or db_session_class."
+            )
+
+        if self.connection.in_transaction:
+            # Left open by the previous test
+            self.connection.rollback()
+
+        golden.backup(self.connection)
+
+        return self.engine
+
+    def close(self) -> None:
+        self.engine.dispose()
+        self.connection.close()
+        self.golden.close()
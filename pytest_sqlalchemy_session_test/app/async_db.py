@@ -0,0 +1,16 @@
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from pytest_sqlalchemy_session_test.app.db import get_db_dsn
+
+
+def get_async_db_dsn() -> URL:
+    return get_db_dsn().set(drivername="postgresql+asyncpg")
+
+
+# Connections of asyncpg are bound to an event loop, don't keep them between tests
+engine = create_async_engine(url=get_async_db_dsn(), poolclass=NullPool)
+
+session_factory = sessionmaker(engine, class_=AsyncSession)
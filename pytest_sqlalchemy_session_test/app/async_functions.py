@@ -0,0 +1,35 @@
+from pytest_sqlalchemy_session_test.app import async_db
+from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+
+async def create_instance_with_commit(instance_id: int) -> None:
+    async with async_db.session_factory() as session:
+        await session.execute(sample_table.insert(), {"id": instance_id})
+        await session.commit()
+
+
+async def create_instance_with_rollback(
+    instance_id_before: int, instance_id_for_rollback: int, instance_id_after: int
+) -> None:
+    async with async_db.session_factory() as session:
+        await session.execute(sample_table.insert(), {"id": instance_id_before})
+        await session.commit()
+        await session.execute(sample_table.insert(), {"id": instance_id_for_rollback})
+        await session.rollback()
+        await session.execute(sample_table.insert(), {"id": instance_id_after})
+        await session.commit()
+
+
+async def create_instance_with_begin(instance_id: int) -> None:
+    async with async_db.session_factory() as session, session.begin():
+        await session.execute(sample_table.insert(), {"id": instance_id})
+
+
+async def create_instance_with_begin_nested(
+    instance_id: int, nested_instance_id: int
+) -> None:
+    async with async_db.session_factory() as session, session.begin():
+        await session.execute(sample_table.insert(), {"id": instance_id})
+
+        async with session.begin_nested():
+            await session.execute(sample_table.insert(), {"id": nested_instance_id})
@@ -1,8 +1,9 @@
 import os
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import URL, make_url
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 DB_DSN = os.getenv(
     "DB_DSN",
@@ -15,6 +16,16 @@ def get_db_dsn() -> URL:
     return dsn
 
 
-engine = create_engine(url=get_db_dsn())
+def create_db_engine(url: URL) -> Engine:
+    if url.get_backend_name() == "sqlite":
+        # A single connection keeps the in-memory database alive for all threads
+        return create_engine(
+            url=url, poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+
+    return create_engine(url=url)
+
+
+engine = create_db_engine(get_db_dsn())
 
 session_factory = sessionmaker(engine)
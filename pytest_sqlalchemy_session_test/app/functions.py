@@ -1,10 +1,21 @@
-from sqlalchemy.dialects.postgresql import insert
+import typing
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from pytest_sqlalchemy_session_test.app import db
 from pytest_sqlalchemy_session_test.app.tables import sample_table
 
 
+def insert(table: Table) -> typing.Union[postgresql.Insert, sqlite.Insert]:
+    """An INSERT supporting ON CONFLICT on the database of the application."""
+    if db.engine.dialect.name == "sqlite":
+        return sqlite.insert(table)
+
+    return postgresql.insert(table)
+
+
 def create_instance_with_commit(instance_id: int) -> None:
     with db.session_factory() as session:
         session.execute(sample_table.insert(), {"id": instance_id})
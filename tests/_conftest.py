@@ -2,10 +2,11 @@ import typing
 
 import pytest
 from sqlalchemy.engine import URL, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
-from pytest_sqlalchemy_session_test.app import db
+from pytest_sqlalchemy_session_test.app import async_db, db
 from pytest_sqlalchemy_session_test.app.tables import metadata
 
 pytest_plugins = ["pytest_sqlalchemy_session.plugin"]
@@ -39,6 +40,12 @@ def _db(database: None) -> typing.Tuple[sessionmaker, Engine]:
     return db.session_factory, db.engine
 
 
+@pytest.fixture(scope="session")
+def _async_db(database: None) -> typing.Tuple[sessionmaker, AsyncEngine]:
+    """Necessary for async sessions of pytest-sqlalchemy-session plugin."""
+    return async_db.session_factory, async_db.engine
+
+
 @pytest.fixture(scope="function")
 def custom_session(database: None):
     with db.session_factory() as session:
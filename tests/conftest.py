@@ -1,7 +1,12 @@
 import os
+import typing
 
+# Import the async driver once for all test runs: pytester unloads the modules
+# imported by every in-process run, and C extensions can't be loaded again
+import asyncpg  # noqa
 import pytest
-from pytest import Pytester
+import sqlalchemy.ext.asyncio  # noqa
+from pytest import FixtureRequest, Pytester
 
 pytest_plugins = "pytester"
 
@@ -9,6 +14,11 @@ pytest_plugins = "pytester"
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def make_db_ini(pytester: Pytester, options: typing.Dict[str, str]) -> None:
+    lines = [f"{name}={value}" for name, value in options.items()]
+    pytester.makeini("\n".join(["[pytest]", *lines]))
+
+
 @pytest.fixture(scope="module")
 def conftest() -> str:
     """
@@ -21,24 +31,59 @@ def conftest() -> str:
     return conftest
 
 
+@pytest.fixture(
+    params=[{}, {"reuse-db-connection": "True"}],
+    ids=["default", "reuse-connection"],
+)
+def db_ini(request: FixtureRequest) -> typing.Dict[str, str]:
+    """
+    Plugin options of the temporary test directory: every test runs in each mode.
+    """
+    return dict(request.param)
+
+
 @pytest.fixture
-def db_testdir(conftest, pytester: Pytester) -> Pytester:
+def db_testdir(conftest, db_ini: typing.Dict[str, str], pytester: Pytester) -> Pytester:
     """
     Set up a temporary test directory loaded with the configuration file for
     the tests.
     """
     pytester.makeconftest(conftest)
+    make_db_ini(pytester, db_ini)
 
     return pytester
 
 
 @pytest.fixture
-def db_testdir_with_strict_mode(db_testdir: Pytester) -> Pytester:
-    db_testdir.makeini(
-        """
-        [pytest]
-        strict-db=True
-        """
-    )
+def db_testdir_with_strict_mode(
+    db_testdir: Pytester, db_ini: typing.Dict[str, str]
+) -> Pytester:
+    make_db_ini(db_testdir, {**db_ini, "strict-db": "True"})
+
+    return db_testdir
+
+
+@pytest.fixture
+def db_testdir_with_cleanup(
+    db_testdir: Pytester, db_ini: typing.Dict[str, str]
+) -> Pytester:
+    make_db_ini(db_testdir, {**db_ini, "transactional-db-cleanup": "True"})
 
     return db_testdir
+
+
+@pytest.fixture
+def db_testdir_with_engine_routing(
+    db_testdir: Pytester, db_ini: typing.Dict[str, str]
+) -> Pytester:
+    make_db_ini(db_testdir, {**db_ini, "route-db-engine": "True"})
+
+    return db_testdir
+
+
+@pytest.fixture
+def db_testdir_with_reuse_connection(conftest, pytester: Pytester) -> Pytester:
+    pytester.makeconftest(conftest)
+    make_db_ini(pytester, {"reuse-db-connection": "True"})
+
+    return pytester
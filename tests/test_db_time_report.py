@@ -0,0 +1,69 @@
+import json
+import logging
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+SOURCE = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app import functions
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    @pytest.mark.sqlalchemy_db
+    def test_code_transaction_commit():
+        functions.create_instance_with_rollback(1, 2, 3)
+
+    def test_without_db():
+        pass
+
+    # The last test tears down the session fixtures
+    def test_fixture_transaction_commit(db_session):
+        db_session.execute(sample_table.insert(), {"id": 1})
+        db_session.execute(sample_table.select()).fetchall()
+"""
+
+
+def test__db_time_report__terminal_summary(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(SOURCE)
+
+    result = db_testdir.runpytest("--db-time-report")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(
+        [
+            "*= slowest DB tests =*",
+            "*db time*statements*rows*fixtures*test",
+            "*test__db_time_report__terminal_summary.py::test_*",
+            "*test__db_time_report__terminal_summary.py::test_*",
+            "*total of 3",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*::test_without_db")
+
+
+def test__db_time_report__json(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(SOURCE)
+
+    result = db_testdir.runpytest("--db-time-report-json=report.json")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+
+    with open(db_testdir.path / "report.json") as report_file:
+        report = json.load(report_file)
+
+    tests = report["tests"]
+    code_test = tests["test__db_time_report__json.py::test_code_transaction_commit"]
+    fixture_test = tests[
+        "test__db_time_report__json.py::test_fixture_transaction_commit"
+    ]
+
+    assert code_test["statements"] >= 3
+    assert code_test["fixture_time"] > 0
+    assert fixture_test["rows"] >= 2
+    assert tests["test__db_time_report__json.py::test_without_db"]["statements"] == 0
+    assert report["totals"]["statements"] == sum(
+        test["statements"] for test in tests.values()
+    )
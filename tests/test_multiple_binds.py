@@ -0,0 +1,68 @@
+import logging
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+CONFTEST = """
+    import pytest
+    from sqlalchemy.orm import sessionmaker
+    from pytest_sqlalchemy_session.database import provision_database
+    from pytest_sqlalchemy_session_test.app import db
+    from pytest_sqlalchemy_session_test.app.tables import metadata
+
+    pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+    @pytest.fixture(scope="session")
+    def _db_url():
+        return db.get_db_dsn().set(database="pytest_sqlalchemy_session_primary")
+
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        return metadata.create_all
+
+    @pytest.fixture(scope="session")
+    def _dbs(_db):
+        url = db.get_db_dsn().set(database="pytest_sqlalchemy_session_reporting")
+
+        with provision_database(url, metadata.create_all) as engine:
+            yield {"default": _db, "reporting": (sessionmaker(engine), engine)}
+"""
+
+SOURCE = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    @pytest.fixture
+    def factories(_dbs):
+        return {name: session_factory for name, (session_factory, _) in _dbs.items()}
+
+    @pytest.mark.parametrize("instance_id", [1, 2])
+    @pytest.mark.sqlalchemy_db
+    def test_code_transaction_commit(factories, db_sessions, db_session, instance_id):
+        for name, session_factory in factories.items():
+            with session_factory() as session:
+                session.execute(sample_table.insert(), {"id": instance_id})
+                session.commit()
+
+        assert db_sessions["default"] is db_session
+        assert db_sessions["default"].execute(sample_table.select()).fetchall() == [(instance_id,)]
+        assert db_sessions["reporting"].execute(sample_table.select()).fetchall() == [(instance_id,)]
+
+    def test_fixture_transaction_commit(db_sessions):
+        for name, session in db_sessions.items():
+            session.execute(sample_table.insert(), {"id": 1})
+            session.commit()
+
+            assert session.execute(sample_table.select()).fetchall() == [(1,)]
+"""
+
+
+def test__multiple_binds__isolated(pytester: Pytester) -> None:
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    result = pytester.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import typing
+
+from pytest import MonkeyPatch, Pytester
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+XDIST_CONFTEST = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app import db
+    from pytest_sqlalchemy_session_test.app.tables import metadata
+
+    pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+    @pytest.fixture(scope="session")
+    def _db_url():
+        return db.get_db_dsn().set(database="pytest_sqlalchemy_session_baseline")
+
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        return metadata.create_all
+"""
+
+SOURCE = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    SELECTS = {selects}
+
+    @pytest.fixture
+    def seed(db_session):
+        db_session.execute(sample_table.insert(), {{"id": 100}})
+
+    @pytest.mark.parametrize("instance_id", [1, 2])
+    def test_selects(seed, db_session, instance_id):
+        for select_id in range(SELECTS):
+            db_session.execute(sample_table.select().where(sample_table.c.id == select_id)).fetchall()
+
+    def test_without_db():
+        pass
+"""
+
+
+def read_baseline(pytester: Pytester) -> typing.Dict[str, typing.Any]:
+    with open(pytester.path / "baseline.json") as baseline_file:
+        return json.load(baseline_file)["tests"]
+
+
+def test__query_baseline__update(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(SOURCE.format(selects=2))
+
+    result = db_testdir.runpytest(
+        "--db-query-baseline=baseline.json", "--db-query-baseline-update"
+    )
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+
+    # The queries of the fixtures setup aren't counted
+    assert read_baseline(db_testdir) == {
+        f"test__query_baseline__update.py::test_selects[{instance_id}]": {
+            "count": 2,
+            "fingerprints": {
+                "SELECT sample_table.id FROM sample_table WHERE sample_table.id = ?": 2
+            },
+        }
+        for instance_id in [1, 2]
+    }
+
+    db_testdir.makepyfile(SOURCE.format(selects=0))
+    db_testdir.runpytest(
+        "--db-query-baseline=baseline.json",
+        "--db-query-baseline-update",
+        "-k",
+        "test_selects[1]",
+    ).assert_outcomes(passed=1)
+
+    # The tests that didn't run keep their entries
+    assert list(read_baseline(db_testdir)) == [
+        "test__query_baseline__update.py::test_selects[2]"
+    ]
+
+
+def test__query_baseline__regression(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(SOURCE.format(selects=2))
+    db_testdir.runpytest(
+        "--db-query-baseline=baseline.json", "--db-query-baseline-update"
+    ).assert_outcomes(passed=3)
+
+    db_testdir.makepyfile(SOURCE.format(selects=3))
+    result = db_testdir.runpytest("--db-query-baseline=baseline.json")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*Expected at most 2 queries as in the query baseline, 3 were executed:",
+            "*+1 x SELECT sample_table.id FROM sample_table WHERE sample_table.id = ?",
+        ]
+    )
+
+    db_testdir.runpytest(
+        "--db-query-baseline=baseline.json", "-o", "db-query-baseline-tolerance=1"
+    ).assert_outcomes(passed=3)
+
+    result = db_testdir.runpytest(
+        "--db-query-baseline=baseline.json", "-o", "db-query-baseline-warn=True"
+    )
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(
+        ["*Expected at most 2 queries as in the query baseline*"]
+    )
+
+
+def test__query_baseline__xdist(pytester: Pytester, monkeypatch: MonkeyPatch) -> None:
+    # The workers are new processes, make the test app importable in them
+    monkeypatch.setenv("PYTHONPATH", ROOT_DIR)
+    pytester.makeconftest(XDIST_CONFTEST)
+    pytester.makepyfile(SOURCE.format(selects=1))
+
+    result = pytester.runpytest_subprocess(
+        "-p",
+        "xdist",
+        "-n",
+        "2",
+        "--db-query-baseline=baseline.json",
+        "--db-query-baseline-update",
+    )
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+    assert sorted(read_baseline(pytester)) == [
+        "test__query_baseline__xdist.py::test_selects[1]",
+        "test__query_baseline__xdist.py::test_selects[2]",
+    ]
@@ -0,0 +1,126 @@
+import logging
+
+from pytest import MonkeyPatch, Pytester
+
+logger = logging.getLogger(__name__)
+
+CONFTEST = """
+    import os
+
+    import pytest
+    from pytest_sqlalchemy_session.database import database_exists
+    from pytest_sqlalchemy_session_test.app import db
+    from pytest_sqlalchemy_session_test.app.tables import metadata
+
+    pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+    @pytest.fixture(scope="session")
+    def _db_url():
+        return db.get_db_dsn().set(database="pytest_sqlalchemy_session_reuse")
+
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        def setup(connection):
+            with open(os.path.join(os.path.dirname(__file__), "setups.txt"), "a") as setups:
+                setups.write("setup\\n")
+
+            metadata.create_all(connection)
+
+        return setup
+
+    @pytest.fixture(scope="session")
+    def _db_schema_key():
+        return os.environ.get("SCHEMA_KEY")
+
+    def pytest_sessionfinish(session):
+        url = db.get_db_dsn().set(database="pytest_sqlalchemy_session_reuse")
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+
+        if reporter is not None:
+            reporter.write_line(f"Database kept: {database_exists(url)}")
+"""
+
+DROP_TEMPLATES_CONFTEST = (
+    CONFTEST
+    + """
+    def pytest_unconfigure(config):
+        from pytest_sqlalchemy_session.database import drop_template_databases
+
+        drop_template_databases(db.get_db_dsn().set(database="pytest_sqlalchemy_session_reuse"))
+"""
+)
+
+SOURCE = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    @pytest.mark.sqlalchemy_db
+    def test_transaction_commit(db_session):
+        db_session.execute(sample_table.insert(), {"id": 1})
+        db_session.commit()
+
+        assert db_session.execute(sample_table.select()).fetchall() == [(1,)]
+"""
+
+
+def count_setups(pytester: Pytester) -> int:
+    return len((pytester.path / "setups.txt").read_text().splitlines())
+
+
+def test__reuse_db__database_kept_between_runs(
+    pytester: Pytester, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setenv("SCHEMA_KEY", "kept")
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    pytester.runpytest("--reuse-db").assert_outcomes(passed=1)
+    result = pytester.runpytest("--reuse-db")
+
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*Database kept: True"])
+    assert count_setups(pytester) == 1
+
+    # Without the option the database is dropped at the end, the templates as well
+    pytester.makeconftest(DROP_TEMPLATES_CONFTEST)
+    result = pytester.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*Database kept: False"])
+    assert count_setups(pytester) == 1
+
+
+def test__reuse_db__schema_key_required(pytester: Pytester) -> None:
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    result = pytester.runpytest("--reuse-db")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(["*--reuse-db requires the _db_schema_key fixture*"])
+
+
+def test__reuse_db__rebuilt_on_new_fingerprint(
+    pytester: Pytester, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setenv("SCHEMA_KEY", "key")
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    pytester.runpytest("--reuse-db").assert_outcomes(passed=1)
+    pytester.runpytest("--reuse-db").assert_outcomes(passed=1)
+
+    assert count_setups(pytester) == 1
+
+    monkeypatch.setenv("SCHEMA_KEY", "new-key")
+    result = pytester.runpytest("--reuse-db")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+    assert count_setups(pytester) == 2
+
+    # Drop the database and the templates
+    pytester.makeconftest(DROP_TEMPLATES_CONFTEST)
+    pytester.runpytest().assert_outcomes(passed=1)
@@ -0,0 +1,60 @@
+import logging
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+
+def test__sql_log__dumped_on_failure(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        def test_passed(db_session):
+            db_session.execute(sample_table.insert(), {"id": 1})
+
+        def test_failed(db_session):
+            db_session.execute(sample_table.insert(), {"id": 2})
+            db_session.execute(sample_table.insert(), {"id": 3})
+            db_session.execute(sample_table.select().where(sample_table.c.id == 4)).fetchall()
+
+            assert False
+        """
+    )
+
+    result = db_testdir.runpytest("--db-sql-log=2")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*- Captured SQL call -*",
+            "The last 2 statements, at most 2:",
+            "INSERT INTO sample_table (id) VALUES (%(id)s)",
+            "  parameters: {'id': 3}",
+            "SELECT sample_table.id *",
+            "  parameters: {'id_1': 4}",
+        ]
+    )
+    # Only the last statements of the failed test are kept
+    result.stdout.no_fnmatch_line("*{'id': 1}")
+    result.stdout.no_fnmatch_line("*{'id': 2}")
+
+
+def test__sql_log__disabled(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        def test_failed(db_session):
+            db_session.execute(sample_table.insert(), {"id": 1})
+
+            assert False
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(failed=1)
+    result.stdout.no_fnmatch_line("*Captured SQL*")
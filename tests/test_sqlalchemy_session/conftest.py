@@ -0,0 +1,34 @@
+import pytest
+from pytest import FixtureRequest, MonkeyPatch
+
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+
+SQLITE_DSN = "sqlite://"
+
+
+@pytest.fixture(params=["postgresql", "sqlite"], autouse=True)
+def db_backend(request: FixtureRequest, monkeypatch: MonkeyPatch) -> str:
+    """
+    Every test of the transactional contexts runs against each database: the
+    application of the temporary test directory reads its DSN at import.
+    """
+    if request.param == "sqlite":
+        monkeypatch.setenv("DB_DSN", SQLITE_DSN)
+
+    return request.param
+
+
+@pytest.fixture
+def separate_connections(db_backend: str) -> None:
+    """
+    Skip on SQLite the tests whose sessions have connections of their own
+    next to the one of the test: an in-memory database has a single connection.
+    """
+    if db_backend == "sqlite":
+        pytest.skip("An in-memory SQLite database has a single connection")
+
+
+@pytest.fixture
+def insert_returning(db_backend: str) -> None:
+    if db_backend == "sqlite" and not NATIVE_JOIN_TRANSACTION:
+        pytest.skip("SQLAlchemy 2.0 is required for RETURNING on SQLite")
@@ -0,0 +1,202 @@
+import logging
+
+import pytest
+from pytest import Pytester
+
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def db_backend() -> str:
+    """The async sessions of the test application use asyncpg only."""
+    return "postgresql"
+
+
+def test__async__fixture__transaction_commit(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.asyncio
+        async def test_transaction_commit(async_db_session):
+            await async_db_session.execute(sample_table.insert(), {"id": 1})
+            await async_db_session.commit()
+            cursor = await async_db_session.execute(sample_table.select().where(sample_table.c.id == 1))
+
+            assert cursor.fetchone() == (1,)
+
+        @pytest.mark.asyncio
+        async def test_transaction_commit_changes_dont_persist(async_db_session):
+            cursor = await async_db_session.execute(sample_table.select().where(sample_table.c.id == 1))
+
+            assert cursor.fetchone() is None
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
+
+
+def test__async__fixture__transaction_rollback(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.asyncio
+        async def test_transaction_rollback(async_db_session):
+            await async_db_session.execute(sample_table.insert(), {"id": 1})
+            await async_db_session.commit()
+            await async_db_session.execute(sample_table.insert(), {"id": 2})
+            await async_db_session.rollback()
+
+            async with async_db_session.begin():
+                await async_db_session.execute(sample_table.insert(), {"id": 3})
+
+            cursor = await async_db_session.execute(sample_table.select().order_by(sample_table.c.id))
+
+            assert cursor.fetchall() == [(1,), (3,)]
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+def test__async__marker__code_transactions(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app import async_functions, db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.asyncio
+        @pytest.mark.sqlalchemy_db
+        async def test_code_transactions(async_db_session):
+            await async_functions.create_instance_with_commit(1)
+            await async_functions.create_instance_with_rollback(2, 3, 4)
+            await async_functions.create_instance_with_begin(5)
+            await async_functions.create_instance_with_begin_nested(6, 7)
+            cursor = await async_db_session.execute(sample_table.select().order_by(sample_table.c.id))
+
+            assert cursor.fetchall() == [(1,), (2,), (4,), (5,), (6,), (7,)]
+
+        @pytest.mark.asyncio
+        @pytest.mark.sqlalchemy_db
+        async def test_code_transactions_changes_dont_persist(custom_session):
+            await async_functions.create_instance_with_commit(8)
+
+            assert custom_session.execute(sample_table.select()).fetchall() == []
+
+        def test_code_transactions_rolled_back(_db):
+            # A connection of its own, outside of any test transaction
+            with db.engine.connect() as connection:
+                assert connection.execute(sample_table.select()).fetchall() == []
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+
+
+def test__async__marker__routed_factories(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from sqlalchemy.orm import sessionmaker
+        from pytest_sqlalchemy_session_test.app import async_db, db
+
+        @pytest.mark.asyncio
+        @pytest.mark.sqlalchemy_db
+        async def test_routed_factories(async_db_session, db_session):
+            assert async_db.session_factory() is async_db_session
+            assert db.session_factory() is db_session
+
+            # Only the factory of _async_db is routed
+            session = sessionmaker(async_db.engine, class_=AsyncSession)()
+
+            assert session is not async_db_session
+            await session.close()
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+@pytest.mark.skipif(not NATIVE_JOIN_TRANSACTION, reason="SQLAlchemy 2.0 is required")
+def test__async__marker__routed_async_sessionmaker(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        from pytest_sqlalchemy_session_test.app import async_db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        session_factory = async_sessionmaker(async_db.engine)
+
+        @pytest.fixture(scope="session")
+        def _async_db(database):
+            return session_factory, async_db.engine
+
+        @pytest.mark.asyncio
+        @pytest.mark.sqlalchemy_db
+        async def test_routed_async_sessionmaker(async_db_session):
+            assert session_factory() is async_db_session
+
+            # Only the factory of _async_db is routed
+            session = async_sessionmaker(async_db.engine)()
+
+            assert session is not async_db_session
+            await session.close()
+
+            await session_factory().execute(sample_table.insert(), {"id": 1})
+            cursor = await async_db_session.execute(sample_table.select())
+
+            assert cursor.fetchall() == [(1,)]
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+def test__async__missing_async_db_fixture(pytester: Pytester) -> None:
+    pytester.makeconftest(
+        """
+        import pytest
+
+        pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+        @pytest.fixture(scope="session")
+        def _db():
+            return None, None
+        """
+    )
+    pytester.makepyfile(
+        """
+        def test_missing_async_db_fixture(async_db_session):
+            assert True
+        """
+    )
+
+    result = pytester.runpytest()
+
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(
+        ["*NotImplementedError: _async_db fixture not defined*"]
+    )
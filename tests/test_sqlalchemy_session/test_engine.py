@@ -0,0 +1,60 @@
+import logging
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+
+def test__engine__transaction_commit(db_testdir_with_engine_routing: Pytester) -> None:
+    db_testdir_with_engine_routing.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.parametrize("offset", [0, 10])
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_commit(custom_session, offset):
+            with db.engine.begin() as connection:
+                connection.execute(sample_table.insert(), {"id": offset + 1})
+
+            with pytest.raises(ValueError):
+                with db.engine.begin() as connection:
+                    connection.execute(sample_table.insert(), {"id": offset + 2})
+                    raise ValueError()
+
+            with db.engine.connect() as connection:
+                with connection.begin():
+                    connection.execute(sample_table.insert(), {"id": offset + 3})
+
+                transaction = connection.begin()
+                connection.execute(sample_table.insert(), {"id": offset + 4})
+                transaction.rollback()
+
+                # The data of the session and the engine is shared
+                assert connection.execute(sample_table.select()).fetchall() == [(offset + 1,), (offset + 3,)]
+
+            custom_session.execute(sample_table.insert(), {"id": offset + 5})
+
+            with db.engine.connect() as connection:
+                assert connection.execute(sample_table.select()).fetchall() == [
+                    (offset + 1,), (offset + 3,), (offset + 5,)
+                ]
+
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_commit_changes_dont_persist():
+            with db.engine.connect() as connection:
+                assert connection.execute(sample_table.select()).fetchall() == []
+
+        def test_without_marker():
+            from pytest_sqlalchemy_session.connection import TestConnection
+
+            with db.engine.connect() as connection:
+                assert not isinstance(connection, TestConnection)
+        """
+    )
+
+    result = db_testdir_with_engine_routing.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=4)
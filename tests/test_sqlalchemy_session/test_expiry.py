@@ -0,0 +1,85 @@
+import logging
+from typing import Tuple
+
+import pytest
+from pytest import Pytester
+
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+
+logger = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.skipif(
+    NATIVE_JOIN_TRANSACTION,
+    reason="The sessions of SQLAlchemy 2.0 expire their objects on their own",
+)
+
+
+@pytest.mark.parametrize(
+    "expiry, expire_on_commit, expired",
+    [
+        ("all", False, (True, True)),
+        ("none", True, (True, True)),
+        ("none", False, (False, False)),
+        ("dirty-only", True, (False, True)),
+    ],
+)
+def test__expiry__savepoint_restart(
+    db_testdir: Pytester,
+    expiry: str,
+    expire_on_commit: bool,
+    expired: Tuple[bool, bool],
+) -> None:
+    db_testdir.makepyfile(
+        f"""
+        import pytest
+        from sqlalchemy import inspect
+        from sqlalchemy.orm import registry
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        class Sample:
+            def __init__(self, id):
+                self.id = id
+
+        registry().map_imperatively(Sample, sample_table)
+
+        @pytest.mark.sqlalchemy_db
+        def test_expiry():
+            with db.session_factory() as session:
+                session.expire_on_commit = {expire_on_commit}
+                loaded = Sample(1)
+                session.add(loaded)
+                session.commit()
+                loaded.id
+
+                written = Sample(2)
+                session.add(written)
+                session.commit()
+
+                expired = (bool(inspect(loaded).expired_attributes), bool(inspect(written).expired_attributes))
+
+                assert expired == {expired}
+                assert session.query(Sample).count() == 2
+        """
+    )
+
+    result = db_testdir.runpytest("-o", f"db-savepoint-expiry={expiry}")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+def test__expiry__unknown_strategy(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        def test_nothing():
+            pass
+        """
+    )
+
+    result = db_testdir.runpytest("-o", "db-savepoint-expiry=some")
+
+    logger.info(result.stderr.str())
+    result.stderr.fnmatch_lines(
+        ["*db-savepoint-expiry must be one of all, none, dirty-only, not 'some'*"]
+    )
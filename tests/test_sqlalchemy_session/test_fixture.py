@@ -1,5 +1,6 @@
 import logging
 
+import pytest
 from pytest import Pytester
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,7 @@ def test__fixture__transaction_commit(db_testdir: Pytester) -> None:
     result.assert_outcomes(passed=2)
 
 
+@pytest.mark.usefixtures("separate_connections")
 def test__fixture__dont_affect_another_session(
     db_testdir: Pytester,
 ) -> None:
@@ -65,6 +67,7 @@ def test__fixture__dont_affect_another_session(
     result.assert_outcomes(passed=2)
 
 
+@pytest.mark.usefixtures("separate_connections")
 def test__fixture__dont_affect_another_test(
     db_testdir: Pytester,
 ) -> None:
@@ -230,6 +233,7 @@ def test__fixture__transaction_begin_error(db_testdir: Pytester) -> None:
     )
 
 
+@pytest.mark.usefixtures("separate_connections")
 def test__fixture_as_marker__affect_nothing(
     db_testdir: Pytester,
 ) -> None:
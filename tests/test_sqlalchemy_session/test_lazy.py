@@ -0,0 +1,48 @@
+import logging
+import typing
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+
+def test__lazy__connection_is_opened_on_demand(
+    db_testdir: Pytester, db_ini: typing.Dict[str, str]
+) -> None:
+    # The fixture checks a connection out eagerly, the shared one is checked out once
+    fixture_checkouts = 1 if db_ini.get("reuse-db-connection") else 2
+    db_testdir.makepyfile(
+        f"""
+        import pytest
+        from sqlalchemy import event
+        from pytest_sqlalchemy_session_test.app import db
+
+        checkouts = []
+
+        @event.listens_for(db.engine, "checkout")
+        def count_checkout(*args):
+            checkouts.append(args)
+
+        def test_prepare(_db):
+            checkouts.clear()
+
+        def test_without_marker():
+            assert checkouts == []
+
+        @pytest.mark.sqlalchemy_db
+        def test_marker_without_session_usage():
+            assert checkouts == []
+
+        @pytest.mark.sqlalchemy_db
+        def test_marker_with_session_usage(custom_session):
+            assert len(checkouts) == 1
+
+        def test_fixture(db_session):
+            assert len(checkouts) == {fixture_checkouts}
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=5)
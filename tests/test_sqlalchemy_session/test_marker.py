@@ -1,7 +1,10 @@
 import logging
 
+import pytest
 from pytest import Pytester
 
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+
 logger = logging.getLogger(__name__)
 
 
@@ -484,6 +487,10 @@ def test__marker__transaction_begin_nested_rollback(
     result.assert_outcomes(passed=2)
 
 
+@pytest.mark.skipif(
+    NATIVE_JOIN_TRANSACTION,
+    reason="Session.rollback() rolls back the outermost transaction in SQLAlchemy 2.0",
+)
 def test__marker__transaction_begin_nested_commit(
     db_testdir: Pytester,
 ) -> None:
@@ -671,6 +678,7 @@ def test__marker__code_transaction_commit(
     result.assert_outcomes(passed=2)
 
 
+@pytest.mark.usefixtures("insert_returning")
 def test__marker__code_insert_on_conflict_do_nothing(
     db_testdir: Pytester,
 ) -> None:
@@ -867,6 +875,7 @@ def test__marker__code_create_rollback_after_begin(
     result.assert_outcomes(passed=2)
 
 
+@pytest.mark.usefixtures("insert_returning")
 def test__marker__code_create_commit_after_insert_on_conflict_do_nothing_in_begin(
     db_testdir: Pytester,
 ) -> None:
@@ -901,6 +910,7 @@ def test__marker__code_create_commit_after_insert_on_conflict_do_nothing_in_begi
     result.assert_outcomes(passed=2)
 
 
+@pytest.mark.usefixtures("separate_connections")
 def test__marker__code_transaction_rollback(
     db_testdir: Pytester,
 ) -> None:
@@ -1164,3 +1174,57 @@ def test__marker__skip_transaction_commit_without_marker(
 
     logger.info(result.stdout.str())
     result.assert_outcomes(passed=2)
+
+
+@pytest.mark.usefixtures("separate_connections")
+def test__marker__other_session_factories_untouched(
+    db_testdir: Pytester,
+) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from sqlalchemy.orm import sessionmaker
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+        from pytest_sqlalchemy_session_test.app import db
+
+        other_session_factory = sessionmaker(db.engine)
+
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_commit(custom_session):
+            custom_session.execute(sample_table.insert(), {"id": 1})
+            custom_session.commit()
+
+            with other_session_factory() as session:
+                assert session is not custom_session
+                assert session.execute(sample_table.select()).fetchall() == []
+
+            assert type(other_session_factory) is sessionmaker
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+def test__marker__session_route_only_for_marked_tests(
+    db_testdir: Pytester,
+) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+
+        def test_without_marker(request):
+            assert "_auto_mock_session_by_marker" not in request.fixturenames
+
+        @pytest.mark.sqlalchemy_db
+        def test_marker(request):
+            assert "_auto_mock_session_by_marker" in request.fixturenames
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
@@ -0,0 +1,67 @@
+import logging
+
+import pytest
+from pytest import Pytester
+
+from pytest_sqlalchemy_session.compat import NATIVE_JOIN_TRANSACTION
+
+logger = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.skipif(
+    not NATIVE_JOIN_TRANSACTION, reason="SQLAlchemy 2.0 is required"
+)
+
+
+def test__native__session_joins_with_savepoints(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session.session import TestSession
+        from pytest_sqlalchemy_session_test.app import functions
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_commit(db_session):
+            functions.create_instance_with_rollback(1, 2, 3)
+
+            assert not isinstance(db_session, TestSession)
+            assert db_session.join_transaction_mode == "create_savepoint"
+            assert db_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall() == [(1,), (3,)]
+
+        def test_changes_dont_persist(db_session):
+            assert db_session.execute(sample_table.select()).fetchall() == []
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
+
+
+def test__native__rollback_of_outermost_transaction(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_begin_nested(custom_session):
+            with db.session_factory() as session:
+                session.execute(sample_table.insert(), {"id": 1})
+                session.commit()
+
+                with session.begin_nested():
+                    session.execute(sample_table.insert(), {"id": 2})
+
+                session.rollback()
+
+            assert custom_session.execute(sample_table.select()).fetchall() == [(1,)]
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
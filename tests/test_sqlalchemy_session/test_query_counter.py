@@ -0,0 +1,144 @@
+import logging
+
+from pytest import ExitCode, Pytester
+
+from pytest_sqlalchemy_session.queries import get_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def test__query_counter__fingerprint() -> None:
+    assert get_fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'it''s'") == (
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    )
+    assert get_fingerprint("SELECT t.id_1 FROM t WHERE id IN (%(id_1)s, %(id_2)s)") == (
+        "SELECT t.id_1 FROM t WHERE id IN (...)"
+    )
+
+
+def test__query_counter__count(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app import functions
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.sqlalchemy_db
+        def test_code_transaction_commit(db_query_counter):
+            functions.create_instance_with_rollback(1, 2, 3)
+
+            # Savepoints of the transactional context aren't counted
+            assert db_query_counter.count == 3
+
+        def test_fixture_transaction_commit(db_session, db_query_counter, assert_max_queries):
+            with assert_max_queries(2):
+                db_session.execute(sample_table.insert(), {"id": 1})
+                db_session.execute(sample_table.select()).fetchall()
+
+            with pytest.raises(AssertionError, match="Expected at most 1 queries, 2 were executed"):
+                with assert_max_queries(1):
+                    db_session.execute(sample_table.select()).fetchall()
+                    db_session.execute(sample_table.select()).fetchall()
+
+            assert db_query_counter.count == 4
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
+
+
+def test__query_counter__marker(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.fixture
+        def seed(db_session):
+            db_session.execute(sample_table.insert(), {"id": 100})
+
+        @pytest.mark.max_queries(3)
+        def test_within_limit(seed, db_session):
+            for instance_id in range(3):
+                db_session.execute(sample_table.select().where(sample_table.c.id == instance_id)).fetchall()
+
+        @pytest.mark.max_queries(3)
+        def test_n_plus_one(db_session):
+            db_session.execute(sample_table.insert(), {"id": 1})
+
+            for instance_id in range(4):
+                db_session.execute(sample_table.select().where(sample_table.c.id == instance_id)).fetchall()
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*Expected at most 3 queries, 5 were executed:",
+            "*4 x SELECT sample_table.id FROM sample_table WHERE sample_table.id = ?",
+            "*1 x INSERT INTO sample_table (id) VALUES (?)",
+        ]
+    )
+
+
+def test__query_counter__parametrized_marker(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        def test_without_marker(request):
+            assert "_max_queries_by_marker" not in request.fixturenames
+
+        @pytest.mark.parametrize("number", [pytest.param(3, marks=pytest.mark.max_queries(1)), 3])
+        def test_queries(db_session, number):
+            for _ in range(number):
+                db_session.execute(sample_table.select()).fetchall()
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines(["*Expected at most 1 queries, 3 were executed:"])
+
+
+def test__query_counter__marker_not_registered(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        def test_without_marker(request):
+            assert not request.config.pluginmanager.has_plugin("sqlalchemy_session_max_queries")
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+def test__query_counter__marker_without_number(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.max_queries
+        def test_without_number(db_session):
+            pass
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    assert result.ret == ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(
+        ["*The max_queries marker requires the maximum number of queries*"]
+    )
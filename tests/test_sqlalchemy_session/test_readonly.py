@@ -0,0 +1,108 @@
+import logging
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+
+def test__readonly__shared_transaction(pytester: Pytester, conftest: str) -> None:
+    pytester.makeconftest(conftest)
+    pytester.makepyfile(
+        """
+        import pytest
+        from sqlalchemy import event
+        from sqlalchemy.exc import DBAPIError
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        begins = []
+        event.listen(db.engine, "begin", lambda connection: begins.append(connection))
+
+        def test_prepare(_db):
+            begins.clear()
+
+        @pytest.mark.parametrize("number", [1, 2])
+        @pytest.mark.sqlalchemy_db(readonly=True)
+        def test_read(number):
+            with db.session_factory() as session:
+                assert session.execute(sample_table.select()).fetchall() == []
+                session.commit()
+
+            assert len(begins) == 1
+
+        @pytest.mark.sqlalchemy_db(readonly=True)
+        def test_write_fails():
+            with db.session_factory() as session:
+                with pytest.raises(DBAPIError):
+                    session.execute(sample_table.insert(), {"id": 1})
+
+            assert len(begins) == 1
+
+        @pytest.mark.sqlalchemy_db(readonly=True)
+        def test_read_after_failure():
+            with db.session_factory() as session:
+                assert session.execute(sample_table.select()).fetchall() == []
+
+            assert len(begins) == 2
+
+        @pytest.mark.sqlalchemy_db
+        def test_write():
+            with db.session_factory() as session:
+                session.execute(sample_table.insert(), {"id": 1})
+                session.commit()
+
+                assert session.execute(sample_table.select()).fetchall() == [(1,)]
+
+            assert len(begins) == 3
+
+        @pytest.mark.sqlalchemy_db(readonly=True)
+        def test_read_after_write():
+            with db.session_factory() as session:
+                assert session.execute(sample_table.select()).fetchall() == []
+        """
+    )
+
+    result = pytester.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=7)
+
+
+def test__readonly__writes_rejected_with_shared_connection(
+    db_testdir: Pytester,
+) -> None:
+    # The module scope runs the tests in savepoints of the shared connection,
+    # with or without reuse-db-connection
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from sqlalchemy.exc import StatementError
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.fixture(scope="module")
+        def seed(db_session_module):
+            db_session_module.execute(sample_table.insert(), {"id": 1})
+
+        @pytest.mark.parametrize("number", [2, 3])
+        @pytest.mark.sqlalchemy_db(readonly=True)
+        def test_read_seed(seed, number):
+            with db.session_factory() as session:
+                with pytest.raises((StatementError, pytest.UsageError), match="can't write"):
+                    session.execute(sample_table.insert(), {"id": number})
+
+                assert session.execute(sample_table.select()).fetchall() == [(1,)]
+
+        @pytest.mark.sqlalchemy_db
+        def test_write(seed):
+            with db.session_factory() as session:
+                session.execute(sample_table.insert(), {"id": 2})
+
+                assert session.execute(sample_table.select()).fetchall() == [(1,), (2,)]
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
@@ -0,0 +1,120 @@
+import logging
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+
+def test__reuse_connection__single_connection_and_transaction(
+    db_testdir_with_reuse_connection: Pytester,
+) -> None:
+    db_testdir_with_reuse_connection.makepyfile(
+        """
+        import pytest
+        from sqlalchemy import event
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        checkouts = []
+        begins = []
+
+        event.listen(db.engine, "checkout", lambda *args: checkouts.append(args))
+        event.listen(db.engine, "begin", lambda *args: begins.append(args))
+
+        def test_prepare(_db):
+            checkouts.clear()
+            begins.clear()
+
+        @pytest.mark.parametrize("instance_id", [1, 2, 3])
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_commit(custom_session, instance_id):
+            custom_session.execute(sample_table.insert(), {"id": instance_id})
+            custom_session.commit()
+
+            assert custom_session.execute(sample_table.select()).fetchall() == [(instance_id,)]
+            assert len(checkouts) == 1
+            assert len(begins) == 1
+        """
+    )
+
+    result = db_testdir_with_reuse_connection.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=4)
+
+
+def test__reuse_connection__outer_transaction_rollback(
+    db_testdir_with_reuse_connection: Pytester,
+) -> None:
+    db_testdir_with_reuse_connection.makepyfile(
+        """
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        def test_outer_transaction_rollback(db_session):
+            db_session.execute(sample_table.insert(), {"id": 1})
+            db_session.get_bind().get_transaction().rollback()
+
+        def test_changes_dont_persist(db_session):
+            db_session.execute(sample_table.insert(), {"id": 2})
+            db_session.commit()
+
+            assert db_session.execute(sample_table.select()).fetchall() == [(2,)]
+
+        def test_changes_dont_persist_after_restart(db_session):
+            assert db_session.execute(sample_table.select()).fetchall() == []
+        """
+    )
+
+    result = db_testdir_with_reuse_connection.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+
+
+def test__reuse_connection__lazy_test_savepoint(
+    db_testdir_with_reuse_connection: Pytester,
+) -> None:
+    db_testdir_with_reuse_connection.makepyfile(
+        """
+        from pytest_sqlalchemy_session.fixtures import SharedConnection
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        statements = []
+        execute = SharedConnection._execute
+
+        def spy_execute(self, statement):
+            statements.append(statement)
+            execute(self, statement)
+
+        SharedConnection._execute = spy_execute
+
+        def test_untouched(db_session):
+            pass
+
+        def test_write(db_session):
+            assert statements == []
+
+            db_session.execute(sample_table.insert(), {"id": 1})
+            db_session.commit()
+
+            assert statements == ["SAVEPOINT pytest_sqlalchemy_session"]
+
+        def test_read(db_session):
+            assert db_session.execute(sample_table.select()).fetchall() == []
+
+        def test_untouched_after_read(db_session):
+            pass
+
+        def test_rolled_back_once_per_touched_test(db_session):
+            assert statements == [
+                "SAVEPOINT pytest_sqlalchemy_session",
+                "ROLLBACK TO SAVEPOINT pytest_sqlalchemy_session",
+                "ROLLBACK TO SAVEPOINT pytest_sqlalchemy_session",
+            ]
+        """
+    )
+
+    result = db_testdir_with_reuse_connection.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=5)
@@ -0,0 +1,93 @@
+import logging
+
+import pytest
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.usefixtures("separate_connections")
+def test__scoped__module_data_is_shared(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        test_seeded="""
+        import pytest
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.fixture(scope="module", autouse=True)
+        def seed(db_session_module):
+            db_session_module.execute(sample_table.insert(), [{"id": 1}, {"id": 2}])
+            db_session_module.commit()
+
+        def test_transaction_commit(db_session):
+            db_session.execute(sample_table.insert(), {"id": 3})
+            db_session.commit()
+            instances = db_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall()
+
+            assert instances == [(1,), (2,), (3,)]
+
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_commit_changes_dont_persist(custom_session):
+            instances = custom_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall()
+
+            assert instances == [(1,), (2,)]
+        """,
+        test_without_seed="""
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        def test_module_changes_dont_persist(db_session):
+            assert db_session.execute(sample_table.select()).fetchall() == []
+        """,
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+
+
+def test__scoped__class_data_on_top_of_module_data(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app import functions
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.fixture(scope="module", autouse=True)
+        def seed_module(db_session_module):
+            db_session_module.execute(sample_table.insert(), {"id": 1})
+            db_session_module.commit()
+
+        class TestClass:
+            @pytest.fixture(scope="class", autouse=True)
+            def seed_class(self, db_session_class):
+                with db_session_class.begin():
+                    db_session_class.execute(sample_table.insert(), {"id": 2})
+
+            @pytest.mark.sqlalchemy_db
+            def test_code_transaction_commit(self, custom_session):
+                functions.create_instance_with_commit(3)
+                instances = custom_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall()
+
+                assert instances == [(1,), (2,), (3,)]
+
+            def test_transaction_rollback(self, db_session):
+                db_session.execute(sample_table.delete())
+                db_session.commit()
+
+                assert db_session.execute(sample_table.select()).fetchall() == []
+
+            def test_changes_dont_persist(self, db_session, db_session_module):
+                instances = db_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall()
+
+                assert instances == [(1,), (2,)]
+                assert db_session_module.execute(sample_table.select()).fetchall() == instances
+
+        def test_class_changes_dont_persist(db_session):
+            assert db_session.execute(sample_table.select()).fetchall() == [(1,)]
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=4)
@@ -0,0 +1,160 @@
+import logging
+
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+
+def test__threads__transaction_commit(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        import pytest
+        from pytest_sqlalchemy_session_test.app import functions
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.parametrize("offset", [0, 100])
+        @pytest.mark.sqlalchemy_db(threads=True)
+        def test_transaction_commit(custom_session, offset):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                # Commit, rollback and begin blocks of several threads at once
+                list(executor.map(functions.create_instance_with_commit, range(offset, offset + 10)))
+                list(executor.map(functions.create_commit_after_begin, range(offset + 10, offset + 20)))
+                executor.submit(functions.create_instance_with_rollback, offset + 20, offset + 21, offset + 22).result()
+
+            instances = custom_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall()
+
+            assert instances == [(offset + number,) for number in [*range(20), 20, 22]]
+
+        @pytest.mark.sqlalchemy_db
+        def test_transaction_commit_changes_dont_persist(custom_session):
+            assert custom_session.execute(sample_table.select()).fetchall() == []
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+
+
+def test__threads__sessions(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        import pytest
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.sqlalchemy_db(threads=True)
+        def test_sessions(db_session):
+            db_session.execute(sample_table.insert(), {"id": 1})
+            left_open = []
+
+            def work(instance_id):
+                with db.session_factory() as session:
+                    assert session is not db_session
+                    # The data of the test session is visible to the threads
+                    assert session.execute(sample_table.select().where(sample_table.c.id == 1)).fetchone() == (1,)
+
+                    session.execute(sample_table.insert(), {"id": instance_id})
+                    session.commit()
+                    session.execute(sample_table.insert(), {"id": -instance_id})
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(work, range(2, 12)))
+
+            # A session left open by a thread is closed by the test
+            thread = threading.Thread(target=lambda: left_open.append(db.session_factory()))
+            thread.start()
+            thread.join()
+
+            assert db.session_factory() is db_session
+            assert db_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall() == [
+                (instance_id,) for instance_id in range(1, 12)
+            ]
+        """
+    )
+
+    result = db_testdir.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+def test__threads__sessions_left_open(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        import pytest
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.sqlalchemy_db(threads=True)
+        def test_sessions_left_open(db_session):
+            def work(instance_id):
+                # The threads of the pool never close their sessions
+                session = db.session_factory()
+                session.execute(sample_table.insert(), {"id": instance_id})
+                session.commit()
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(work, range(1, 5)))
+
+            assert db_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall() == [
+                (instance_id,) for instance_id in range(1, 5)
+            ]
+        """
+    )
+
+    result = db_testdir.runpytest("-o", "db-threads-timeout=5")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
+
+
+def test__threads__connection_held_by_thread(db_testdir: Pytester) -> None:
+    db_testdir.makepyfile(
+        """
+        import threading
+
+        import pytest
+        from sqlalchemy.exc import StatementError
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.sqlalchemy_db(threads=True)
+        def test_connection_held(db_session):
+            opened, done = threading.Event(), threading.Event()
+
+            def work():
+                with db.session_factory() as session:
+                    session.execute(sample_table.insert(), {"id": 1})
+                    opened.set()
+                    done.wait()
+                    session.commit()
+
+            thread = threading.Thread(target=work)
+            thread.start()
+            opened.wait()
+
+            try:
+                # The statements of the test wait for the transaction of the thread
+                with pytest.raises((StatementError, pytest.UsageError), match="held by another thread"):
+                    db_session.execute(sample_table.select())
+            finally:
+                done.set()
+                thread.join()
+
+            assert db_session.execute(sample_table.select()).fetchall() == [(1,)]
+        """
+    )
+
+    result = db_testdir.runpytest("-o", "db-threads-timeout=0.5")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=1)
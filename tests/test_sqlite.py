@@ -0,0 +1,181 @@
+import logging
+
+import pytest
+from pytest import Pytester
+
+logger = logging.getLogger(__name__)
+
+CONFTEST = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import metadata
+
+    pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+    @pytest.fixture(scope="session")
+    def _db_url():
+        return "{url}"
+
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        return metadata.create_all
+"""
+
+SOURCE = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    @pytest.mark.parametrize("instance_id", [1, 2])
+    def test_transaction_commit(db_session, instance_id):
+        db_session.execute(sample_table.insert(), {"id": instance_id})
+        db_session.commit()
+
+        db_session.begin_nested()
+        db_session.execute(sample_table.insert(), {"id": 10})
+        db_session.rollback()
+
+        db_session.execute(sample_table.insert(), {"id": 20})
+        db_session.commit()
+
+        assert db_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall() == [
+            (instance_id,),
+            (20,),
+        ]
+
+    def test_transaction_commit_changes_dont_persist(db_session):
+        assert db_session.execute(sample_table.select()).fetchall() == []
+"""
+
+
+@pytest.mark.parametrize(
+    "reuse_connection", [False, True], ids=["default", "reuse-connection"]
+)
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///{path}/test.db"])
+def test__sqlite__savepoints(
+    pytester: Pytester, url: str, reuse_connection: bool
+) -> None:
+    pytester.makeconftest(CONFTEST.format(url=url.format(path=pytester.path)))
+    pytester.makepyfile(SOURCE)
+
+    result = pytester.runpytest("-o", f"reuse-db-connection={reuse_connection}")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+    assert not (pytester.path / "test.db").exists()
+
+
+CLONE_CONFTEST = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import metadata, sample_table
+
+    pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+    @pytest.fixture(scope="session")
+    def _db_url():
+        return "sqlite://"
+
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        def setup(connection):
+            metadata.create_all(connection)
+            connection.execute(sample_table.insert(), {"id": 1})
+
+        return setup
+"""
+
+
+def test__sqlite__clone(pytester: Pytester) -> None:
+    pytester.makeconftest(CLONE_CONFTEST)
+    pytester.makepyfile(
+        """
+        import pytest
+        from sqlalchemy import text
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.parametrize("instance_id", [2, 3])
+        @pytest.mark.sqlalchemy_db
+        def test_code_transaction_commit(_db, instance_id):
+            session_factory, _ = _db
+
+            with session_factory() as session:
+                session.execute(sample_table.insert(), {"id": instance_id})
+                session.commit()
+                session.execute(text("CREATE TABLE other_table (id INTEGER)"))
+                session.commit()
+
+            with session_factory() as session:
+                assert session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall() == [
+                    (1,),
+                    (instance_id,),
+                ]
+
+        def test_changes_dont_persist(_db, db_session):
+            _, engine = _db
+
+            assert db_session.bind is not engine
+            assert db_session.execute(sample_table.select()).fetchall() == [(1,)]
+            assert db_session.execute(text("SELECT name FROM sqlite_master")).fetchall() == [("sample_table",)]
+
+            # The golden database is untouched
+            with engine.connect() as connection:
+                assert connection.execute(sample_table.select()).fetchall() == [(1,)]
+        """
+    )
+
+    result = pytester.runpytest("-o", "sqlite-db-clone=True")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=3)
+
+
+def test__sqlite__clone_engine(pytester: Pytester) -> None:
+    pytester.makeconftest(CLONE_CONFTEST)
+    pytester.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        @pytest.mark.parametrize("instance_id", [2, 3])
+        @pytest.mark.sqlalchemy_db
+        def test_engine_begin(_db, db_session, instance_id):
+            _, engine = _db
+
+            # Into the copy of the test, the golden database is untouched
+            with engine.begin() as connection:
+                connection.execute(sample_table.insert(), {"id": instance_id})
+
+            assert db_session.execute(sample_table.select().order_by(sample_table.c.id)).fetchall() == [
+                (1,),
+                (instance_id,),
+            ]
+
+        @pytest.mark.max_queries(0)
+        @pytest.mark.sqlalchemy_db
+        def test_max_queries(db_session):
+            for _ in range(5):
+                db_session.execute(sample_table.select())
+        """
+    )
+
+    result = pytester.runpytest("-o", "sqlite-db-clone=True")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines(["*Expected at most 0 queries, 5 were executed:"])
+
+
+def test__sqlite__clone_in_transaction(pytester: Pytester) -> None:
+    pytester.makeconftest(CLONE_CONFTEST)
+    pytester.makepyfile(
+        """
+        def test_module_session(db_session_module, db_session):
+            pass
+        """
+    )
+
+    result = pytester.runpytest("-o", "sqlite-db-clone=True")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(
+        ["*The SQLite database can't be copied in a transaction*"]
+    )
@@ -36,6 +36,28 @@ def test__strict_mode__usage_only_fixture(
     )
 
 
+def test__strict_mode__rule_of_tests_without_marker(
+    db_testdir_with_strict_mode: Pytester,
+) -> None:
+    db_testdir_with_strict_mode.makepyfile(
+        """
+        import pytest
+
+        def test_without_marker(request):
+            assert "_strict_session_rule" in request.fixturenames
+
+        @pytest.mark.sqlalchemy_db
+        def test_marker(request):
+            assert "_strict_session_rule" not in request.fixturenames
+        """
+    )
+
+    result = db_testdir_with_strict_mode.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
+
+
 def test__strict_mode__without_marker(db_testdir_with_strict_mode: Pytester) -> None:
     db_testdir_with_strict_mode.makepyfile(
         """
@@ -107,6 +129,49 @@ def test__strict_mode__marker_dont_affect_another_test(
     )
 
 
+def test__strict_mode__without_marker_in_thread(
+    db_testdir_with_strict_mode: Pytester,
+) -> None:
+    db_testdir_with_strict_mode.makepyfile(
+        """
+        import threading
+
+        import pytest
+        from sqlalchemy.exc import StatementError
+        from pytest_sqlalchemy_session_test.app import db
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        def select_in_thread():
+            errors = []
+
+            def select():
+                try:
+                    with db.session_factory() as session:
+                        session.execute(sample_table.select()).fetchall()
+                except (StatementError, pytest.UsageError) as error:
+                    errors.append(error)
+
+            thread = threading.Thread(target=select)
+            thread.start()
+            thread.join()
+
+            return errors
+
+        def test_without_marker(_db):
+            assert "marker is required to execute db queries" in str(select_in_thread())
+
+        @pytest.mark.sqlalchemy_db
+        def test_with_marker():
+            assert select_in_thread() == []
+        """
+    )
+
+    result = db_testdir_with_strict_mode.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
+
+
 def test__strict_mode__usage_fixture_and_marker(
     db_testdir_with_strict_mode: Pytester,
 ) -> None:
@@ -193,3 +258,35 @@ def test__strict_mode__usage_transactional_marker(
 
     logger.info(result.stdout.str())
     result.assert_outcomes(passed=2)
+
+
+def test__strict_mode__guard_installed_once(
+    db_testdir_with_strict_mode: Pytester,
+) -> None:
+    db_testdir_with_strict_mode.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app import db
+
+        listeners = set()
+
+        def test_without_marker():
+            listeners.add(len(db.engine.dispatch.before_execute))
+
+        @pytest.mark.sqlalchemy_db
+        def test_with_marker():
+            listeners.add(len(db.engine.dispatch.before_execute))
+
+        @pytest.mark.transactional_db
+        def test_with_transactional_marker():
+            listeners.add(len(db.engine.dispatch.before_execute))
+
+        def test_listeners_count():
+            assert listeners == {1}
+        """
+    )
+
+    result = db_testdir_with_strict_mode.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=4)
@@ -0,0 +1,121 @@
+import logging
+import os
+
+from pytest import MonkeyPatch, Pytester
+from sqlalchemy import Column, Integer, MetaData, Table
+
+from pytest_sqlalchemy_session.database import metadata_hash
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFTEST = """
+    import os
+
+    import pytest
+    from pytest_sqlalchemy_session.database import drop_template_databases
+    from pytest_sqlalchemy_session_test.app import db
+    from pytest_sqlalchemy_session_test.app.tables import metadata
+
+    pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+    DATABASE_URL = db.get_db_dsn().set(database="pytest_sqlalchemy_session_template")
+
+    def pytest_addoption(parser):
+        parser.addoption("--drop-templates", action="store_true")
+
+    @pytest.fixture(scope="session")
+    def _db_url():
+        return DATABASE_URL
+
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        def setup(connection):
+            with open(os.path.join(os.path.dirname(__file__), "setups.txt"), "a") as setups:
+                setups.write("setup\\n")
+
+            metadata.create_all(connection)
+
+        return setup
+
+    @pytest.fixture(scope="session")
+    def _db_schema_key():
+        return os.environ.get("SCHEMA_KEY", "key")
+
+    def pytest_sessionfinish(session):
+        # Only once all workers are done
+        is_worker = hasattr(session.config, "workerinput")
+
+        if session.config.getoption("--drop-templates") and not is_worker:
+            drop_template_databases(DATABASE_URL)
+"""
+
+SOURCE = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    @pytest.mark.parametrize("instance_id", [1, 2])
+    @pytest.mark.sqlalchemy_db
+    def test_transaction_commit(db_session, instance_id):
+        db_session.execute(sample_table.insert(), {"id": instance_id})
+        db_session.commit()
+
+        assert db_session.execute(sample_table.select()).fetchall() == [(instance_id,)]
+"""
+
+
+def count_setups(pytester: Pytester) -> int:
+    setups_path = pytester.path / "setups.txt"
+
+    if not setups_path.exists():
+        return 0
+
+    return len(setups_path.read_text().splitlines())
+
+
+def test__template__metadata_hash() -> None:
+    metadata = MetaData()
+    table = Table("table", metadata, Column("id", Integer, primary_key=True))
+    metadata_key = metadata_hash(metadata)
+
+    assert metadata_hash(metadata) == metadata_key
+
+    table.append_column(Column("value", Integer))
+
+    assert metadata_hash(metadata) != metadata_key
+
+
+def test__template__schema_set_up_once(
+    pytester: Pytester, monkeypatch: MonkeyPatch
+) -> None:
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    pytester.runpytest().assert_outcomes(passed=2)
+    pytester.runpytest().assert_outcomes(passed=2)
+
+    assert count_setups(pytester) == 1
+
+    # A new schema key rebuilds the template
+    monkeypatch.setenv("SCHEMA_KEY", "new-key")
+    result = pytester.runpytest("--drop-templates")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
+    assert count_setups(pytester) == 2
+
+
+def test__template__schema_set_up_once_for_workers(
+    pytester: Pytester, monkeypatch: MonkeyPatch
+) -> None:
+    # The workers are new processes, make the test app importable in them
+    monkeypatch.setenv("PYTHONPATH", ROOT_DIR)
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    result = pytester.runpytest_subprocess("-p", "xdist", "-n", "2", "--drop-templates")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=2)
+    assert count_setups(pytester) == 1
@@ -0,0 +1,102 @@
+import logging
+
+from pytest import ExitCode, Pytester
+
+logger = logging.getLogger(__name__)
+
+
+def test__transactional_cleanup__written_tables(
+    db_testdir_with_cleanup: Pytester,
+) -> None:
+    db_testdir_with_cleanup.makepyfile(
+        """
+        import pytest
+        from sqlalchemy import event, text
+        from pytest_sqlalchemy_session_test.app import db, functions
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        cleanups = []
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def record_cleanup(conn, cursor, statement, *args):
+            if statement.startswith(("TRUNCATE", "DELETE")):
+                cleanups.append(statement)
+
+        @pytest.mark.transactional_db
+        def test_code_transaction_commit():
+            functions.create_instance_with_commit(1)
+
+        def test_changes_dont_persist(custom_session):
+            assert custom_session.execute(sample_table.select()).fetchall() == []
+            assert cleanups == ["TRUNCATE TABLE sample_table RESTART IDENTITY CASCADE"]
+
+        @pytest.mark.transactional_db
+        def test_text_transaction_commit(custom_session):
+            cleanups.clear()
+            custom_session.execute(text('INSERT INTO "sample_table" (id) VALUES (2)'))
+            custom_session.commit()
+
+        def test_text_changes_dont_persist(custom_session):
+            assert custom_session.execute(sample_table.select()).fetchall() == []
+            assert cleanups == ['TRUNCATE TABLE "sample_table" RESTART IDENTITY CASCADE']
+
+        @pytest.mark.transactional_db
+        def test_read_only(custom_session):
+            cleanups.clear()
+            custom_session.execute(sample_table.select()).fetchall()
+
+        def test_nothing_cleaned_up():
+            assert cleanups == []
+        """
+    )
+
+    result = db_testdir_with_cleanup.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=6)
+
+
+def test__transactional_cleanup__parametrized_marker(
+    db_testdir_with_cleanup: Pytester,
+) -> None:
+    db_testdir_with_cleanup.makepyfile(
+        """
+        import pytest
+        from pytest_sqlalchemy_session_test.app import functions
+        from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+        def test_no_cleanup(request):
+            assert "_transactional_db_cleanup" not in request.fixturenames
+
+        @pytest.mark.parametrize("instance_id", [pytest.param(1, marks=pytest.mark.transactional_db), 2])
+        def test_code_transaction_commit(instance_id):
+            if instance_id == 1:
+                functions.create_instance_with_commit(instance_id)
+
+        def test_changes_dont_persist(custom_session):
+            assert custom_session.execute(sample_table.select()).fetchall() == []
+        """
+    )
+
+    result = db_testdir_with_cleanup.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=4)
+
+
+def test__transactional_cleanup__shared_db_snapshot_refused(
+    db_testdir_with_cleanup: Pytester,
+) -> None:
+    db_testdir_with_cleanup.makepyfile(
+        """
+        def test_nothing():
+            pass
+        """
+    )
+
+    result = db_testdir_with_cleanup.runpytest("-o", "shared-db-snapshot=True")
+
+    assert result.ret == ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(
+        ["*shared-db-snapshot can't be used with transactional-db-cleanup*"]
+    )
@@ -0,0 +1,252 @@
+import logging
+import os
+
+from pytest import MonkeyPatch, Pytester
+from sqlalchemy.engine import make_url
+
+from pytest_sqlalchemy_session.database import get_worker_url
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATABASE_NAME = "pytest_sqlalchemy_session_worker"
+
+CONFTEST = f"""
+    import pytest
+    from sqlalchemy import create_engine, text
+    from pytest_sqlalchemy_session_test.app import db
+    from pytest_sqlalchemy_session_test.app.tables import metadata
+
+    pytest_plugins = ['pytest_sqlalchemy_session.plugin']
+
+    @pytest.fixture(scope="session")
+    def _db_url():
+        return db.get_db_dsn().set(database="{DATABASE_NAME}")
+
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        return metadata.create_all
+
+    @pytest.fixture(scope="session")
+    def _db_app():
+        return db.session_factory, db.engine
+
+    def pytest_sessionfinish(session):
+        engine = create_engine(db.get_db_dsn().set(database="postgres"))
+
+        with engine.connect() as connection:
+            query = text("SELECT datname FROM pg_database WHERE datname LIKE '{DATABASE_NAME}%'")
+            databases = connection.execute(query).fetchall()
+
+        engine.dispose()
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+
+        if reporter is not None:
+            reporter.write_line(f"Databases left: {{len(databases)}}")
+"""
+
+SOURCE = """
+    import os
+
+    import pytest
+    from sqlalchemy import func, select
+    from pytest_sqlalchemy_session_test.app import db
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    @pytest.mark.parametrize("instance_id", [1, 2, 3, 4])
+    @pytest.mark.transactional_db
+    def test_transaction_commit(instance_id):
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+        database = "{name}" if worker_id is None else "{name}_" + worker_id
+
+        with db.session_factory() as session:
+            session.execute(sample_table.delete())
+            session.execute(sample_table.insert(), {{"id": instance_id}})
+            session.commit()
+
+            assert session.execute(select(func.current_database())).scalar() == database
+            assert session.execute(sample_table.select()).fetchall() == [(instance_id,)]
+
+        with db.engine.connect() as connection:
+            assert connection.execute(select(func.current_database())).scalar() == database
+
+    @pytest.mark.sqlalchemy_db
+    def test_application_session_routed(db_session):
+        with db.session_factory() as session:
+            assert session is db_session
+""".format(
+    name=DATABASE_NAME
+)
+
+
+def test__xdist__worker_url() -> None:
+    url = make_url("postgresql://localhost/test")
+
+    assert get_worker_url(url) == url
+    assert get_worker_url(url, "gw1").database == "test_gw1"
+
+
+def test__xdist__database_without_workers(pytester: Pytester) -> None:
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    result = pytester.runpytest()
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=5)
+    result.stdout.fnmatch_lines(["*Databases left: 0"])
+
+
+def test__xdist__database_per_worker(
+    pytester: Pytester, monkeypatch: MonkeyPatch
+) -> None:
+    # The workers are new processes, make the test app importable in them
+    monkeypatch.setenv("PYTHONPATH", ROOT_DIR)
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(SOURCE)
+
+    result = pytester.runpytest_subprocess("-p", "xdist", "-n", "2")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=5)
+    result.stdout.fnmatch_lines(["*Databases left: 0"])
+
+
+SNAPSHOT_CONFTEST = CONFTEST.replace(
+    """
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        return metadata.create_all
+""",
+    """
+    @pytest.fixture(scope="session")
+    def _db_setup():
+        def setup(connection):
+            # Fails on a second seeding, the id is the primary key
+            metadata.create_all(connection)
+            connection.execute(sample_table.insert(), {"id": 1})
+
+        return setup
+""",
+).replace(
+    "from pytest_sqlalchemy_session_test.app.tables import metadata",
+    "from pytest_sqlalchemy_session_test.app.tables import metadata, sample_table",
+)
+
+SNAPSHOT_SOURCE = """
+    import pytest
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    @pytest.mark.parametrize("instance_id", [2, 3, 4, 5])
+    def test_shared_database(_db, db_session, instance_id):
+        _, engine = _db
+
+        assert engine.url.database == "{name}"
+
+        db_session.execute(sample_table.insert(), {{"id": instance_id}})
+        db_session.commit()
+
+        assert db_session.execute(sample_table.select()).fetchall() == [(1,), (instance_id,)]
+""".format(
+    name=DATABASE_NAME
+)
+
+COMMIT_AFTER_SNAPSHOT_SOURCE = """
+    @pytest.mark.transactional_db
+    def test_commit(_db):
+        session_factory, _ = _db
+
+        with session_factory() as session:
+            session.execute(sample_table.insert(), {"id": 10})
+            session.commit()
+
+    def test_commit_after_snapshot_invisible(db_session):
+        assert db_session.execute(sample_table.select()).fetchall() == [(1,)]
+"""
+
+
+# Each worker commits once both have exported their snapshot, and checks its
+# snapshot once the other one has committed too
+COMMIT_IN_OTHER_WORKER_SOURCE = """
+    import os
+    import time
+
+    import pytest
+    from sqlalchemy import text
+    from pytest_sqlalchemy_session_test.app import db
+    from pytest_sqlalchemy_session_test.app.tables import sample_table
+
+    def wait_for(query, expected):
+        deadline = time.monotonic() + 30
+
+        while time.monotonic() < deadline:
+            with db.engine.connect() as connection:
+                if connection.execute(text(query)).scalar() == expected:
+                    return
+
+            time.sleep(0.1)
+
+        raise AssertionError(f"{query} never returned {expected}")
+
+    @pytest.mark.transactional_db
+    def test_commit():
+        wait_for(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND query = 'SELECT pg_export_snapshot()'",
+            2,
+        )
+
+        with db.session_factory() as session:
+            worker_number = int(os.environ["PYTEST_XDIST_WORKER"][2:])
+            session.execute(sample_table.insert(), {"id": 10 + worker_number})
+            session.commit()
+
+        wait_for("SELECT count(*) FROM sample_table WHERE id >= 10", 2)
+
+    def test_commit_in_other_worker_invisible(db_session):
+        assert db_session.execute(sample_table.select()).fetchall() == [(1,)]
+"""
+
+
+def test__xdist__shared_snapshot_without_workers(pytester: Pytester) -> None:
+    pytester.makeconftest(SNAPSHOT_CONFTEST)
+    pytester.makepyfile(SNAPSHOT_SOURCE + COMMIT_AFTER_SNAPSHOT_SOURCE)
+
+    result = pytester.runpytest("-o", "shared-db-snapshot=True")
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=6)
+    result.stdout.fnmatch_lines(["*Databases left: 0"])
+
+
+def test__xdist__shared_snapshot_between_workers(
+    pytester: Pytester, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setenv("PYTHONPATH", ROOT_DIR)
+    pytester.makeconftest(SNAPSHOT_CONFTEST)
+    pytester.makepyfile(SNAPSHOT_SOURCE)
+
+    result = pytester.runpytest_subprocess(
+        "-p", "xdist", "-n", "2", "-o", "shared-db-snapshot=True"
+    )
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(["*Databases left: 0"])
+
+
+def test__xdist__shared_snapshot_commit_in_other_worker(
+    pytester: Pytester, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setenv("PYTHONPATH", ROOT_DIR)
+    pytester.makeconftest(SNAPSHOT_CONFTEST)
+    pytester.makepyfile(COMMIT_IN_OTHER_WORKER_SOURCE)
+
+    result = pytester.runpytest_subprocess(
+        "-p", "xdist", "-n", "2", "--dist", "each", "-o", "shared-db-snapshot=True"
+    )
+
+    logger.info(result.stdout.str())
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(["*Databases left: 0"])